@@ -0,0 +1,17 @@
+# Generated by Django 4.2.9 on 2026-10-18 23:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='otp',
+            index=models.Index(condition=models.Q(('is_used', False)), fields=['email', 'expires_at'], name='auth_otp_unused_email_idx'),
+        ),
+    ]
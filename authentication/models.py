@@ -58,6 +58,10 @@ class OTP(models.Model):
     class Meta:
         verbose_name = 'OTP'
         verbose_name_plural = 'OTPs'
+        indexes = [
+            # Verification only looks up unused codes; used ones pile up and are never read
+            models.Index(fields=['email', 'expires_at'], condition=models.Q(is_used=False), name='auth_otp_unused_email_idx'),
+        ]
 
     def __str__(self):
         return f"{self.email} - {self.otp}"
@@ -0,0 +1,151 @@
+"""
+Benchmark of the BirdNET audio pipeline in birds/birdnet_helper.py.
+
+Generates synthetic recordings for each duration/sample-rate pair and times
+decode, resample, framing, silence gating, inference and post-processing
+separately. Each case runs in a fresh process so its peak RSS is reported on
+its own. Results are printed as JSON lines, or written to --output.
+
+The real model is used when it can be loaded; otherwise (or with --stub) a
+stub interpreter returning random logits stands in, so the harness also runs
+with the placeholder .tflite file shipped in the repository.
+
+    python benchmarks/audio_pipeline.py --durations 10,60 --rates 48000,44100
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(REPO_ROOT, 'birds', 'birdnet-models', 'BirdNET_6K_GLOBAL_MODEL.tflite')
+# Anything this small is the placeholder file, not a real model
+MIN_MODEL_BYTES = 1 << 20
+
+
+def synthesize(path, duration, rate, seed=0):
+    """Write a noisy recording with a chirp every few seconds"""
+    import numpy as np
+    import soundfile
+
+    rng = np.random.default_rng(seed)
+    sig = rng.normal(0.0, 0.003, int(duration * rate)).astype('float32')
+    t = np.arange(int(0.8 * rate)) / rate
+    chirp = (0.3 * np.sin(2 * np.pi * (3000 + 2000 * t) * t)).astype('float32')
+    for start in range(0, len(sig) - len(chirp), int(7.3 * rate)):
+        sig[start:start + len(chirp)] += chirp
+    soundfile.write(path, sig, rate, subtype='PCM_16')
+
+
+def run_case(duration, rate, stub, repeat, queue):
+    if stub:
+        os.environ['BIRDNET_STUB_INTERPRETER'] = 'True'
+    os.environ['BIRDNET_AUDIO_CACHE_SIZE'] = '0'
+    os.chdir(REPO_ROOT)
+    sys.path.insert(0, REPO_ROOT)
+
+    import numpy as np
+    import soundfile
+    from birds import birdnet_helper as helper
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, f'synthetic_{duration}s_{rate}.wav')
+        synthesize(path, duration, rate)
+
+        helper.load_label_table()
+        model = helper.create_interpreter()
+        interpreter, input_index, mdata_index, output_index = model
+        mdata = np.expand_dims(helper.convert_metadata(np.array([-1, -1, 24])), 0).astype('float32')
+
+        timings = {stage: [] for stage in ('decode', 'resample', 'framing', 'gate', 'inference', 'postprocess', 'total')}
+        windows = invoked = 0
+        for _ in range(repeat):
+            started = time.perf_counter()
+
+            t = time.perf_counter()
+            sig, native_rate = soundfile.read(path, dtype='float32', always_2d=True)
+            sig = sig.mean(axis=1)
+            timings['decode'].append(time.perf_counter() - t)
+
+            t = time.perf_counter()
+            sig = helper.resample(sig, native_rate, 48000)
+            timings['resample'].append(time.perf_counter() - t)
+
+            t = time.perf_counter()
+            chunks = helper.split_signal(sig, 48000, 0.0)
+            timings['framing'].append(time.perf_counter() - t)
+
+            t = time.perf_counter()
+            active = np.flatnonzero(helper.silence_gate(chunks)) if helper.SILENCE_GATE_ENABLED else np.arange(len(chunks))
+            timings['gate'].append(time.perf_counter() - t)
+
+            inference = postprocess = 0.0
+            for i in active:
+                t = time.perf_counter()
+                interpreter.set_tensor(input_index, np.expand_dims(chunks[i], 0).astype('float32'))
+                interpreter.set_tensor(mdata_index, mdata)
+                interpreter.invoke()
+                prediction = interpreter.get_tensor(output_index)[0]
+                inference += time.perf_counter() - t
+
+                t = time.perf_counter()
+                helper.postprocess_prediction(prediction, 1.0)
+                postprocess += time.perf_counter() - t
+            timings['inference'].append(inference)
+            timings['postprocess'].append(postprocess)
+            timings['total'].append(time.perf_counter() - started)
+            windows, invoked = len(chunks), len(active)
+
+    queue.put({
+        'duration_s': duration,
+        'sample_rate': rate,
+        'stub_interpreter': stub,
+        'repeat': repeat,
+        'windows': windows,
+        'invocations': invoked,
+        'timings_s': {stage: min(values) for stage, values in timings.items()},
+        'realtime_factor': duration / min(timings['total']),
+        # ru_maxrss is reported in kilobytes on Linux and bytes on macOS
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--durations', default='10,60,600,3600', help='Comma-separated durations in seconds')
+    parser.add_argument('--rates', default='48000,44100,22050', help='Comma-separated sample rates')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per case; the fastest is reported')
+    parser.add_argument('--stub', action='store_true', help='Force the stub interpreter')
+    parser.add_argument('--output', help='Write all results to this JSON file')
+    args = parser.parse_args()
+
+    stub = args.stub or not os.path.exists(MODEL_PATH) or os.path.getsize(MODEL_PATH) < MIN_MODEL_BYTES
+    ctx = multiprocessing.get_context('spawn')
+    results = []
+    for duration in [float(d) for d in args.durations.split(',')]:
+        for rate in [int(r) for r in args.rates.split(',')]:
+            queue = ctx.Queue()
+            process = ctx.Process(target=run_case, args=(duration, rate, stub, args.repeat, queue))
+            process.start()
+            result = queue.get()
+            process.join()
+            results.append(result)
+            print(json.dumps(result), flush=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'cpu_count': os.cpu_count(),
+                'results': results,
+            }, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
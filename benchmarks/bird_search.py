@@ -0,0 +1,212 @@
+"""
+Bird catalog search latency and typo tolerance: icontains against birds/search.py.
+
+Seeds a throwaway SQLite database (or uses DB_* from the environment with
+--use-env-db) with a generated catalog of N species, then runs the same
+queries through the old name/scientific_name icontains filter and through
+the configured search backend, taking the first page (20 rows) of each.
+Queries come in five kinds, drawn from random catalog birds:
+
+    exact       a full common name
+    prefix      the first letters of one word of a name
+    typo        a name word with one letter dropped, doubled or swapped
+    multiword   two words of a name, in order
+    scientific  a genus
+
+Latency is reported as p50/p95 ms per kind, recall as the share of queries
+whose bird is in the top 10 and empty as the share that found nothing.
+Generated names share words with many other birds, so for everything but
+exact queries recall partly shows how ties fall; empty is the plainer
+measure of typo tolerance. On PostgreSQL run it with
+--use-env-db so the trigram indexes from birds migration 0006 are used;
+everything is rolled back afterwards.
+
+Results are printed as JSON lines, or written to --output.
+
+    python benchmarks/bird_search.py --species 10000,50000 --queries 100
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGE = 20
+KINDS = ['exact', 'prefix', 'typo', 'multiword', 'scientific']
+
+REGIONS = ['Northern', 'Southern', 'Eastern', 'Western', 'Common', 'Lesser', 'Greater', 'Little', 'Great', 'Mountain',
+           'Forest', 'Desert', 'Island', 'Coastal', 'Marsh', 'River', 'Highland', 'Tropical', 'Arctic', 'Plains']
+TRAITS = ['Blue', 'Red', 'Black', 'White', 'Golden', 'Grey', 'Spotted', 'Striped', 'Crested', 'Collared', 'Rufous',
+          'Olive', 'Scarlet', 'Yellow', 'Green', 'Brown', 'Pied', 'Masked', 'Hooded', 'Barred', 'Chestnut', 'Ashy',
+          'Sooty', 'Crimson', 'Tawny']
+KINDS_OF_BIRD = ['Cardinal', 'Robin', 'Warbler', 'Sparrow', 'Finch', 'Thrush', 'Wren', 'Flycatcher', 'Tanager',
+                 'Kingfisher', 'Woodpecker', 'Heron', 'Owl', 'Hawk', 'Falcon', 'Dove', 'Pigeon', 'Parrot', 'Swallow',
+                 'Swift', 'Oriole', 'Bunting', 'Lark', 'Pipit', 'Babbler']
+SYLLABLES = ['ca', 'ro', 'tur', 'dus', 'pi', 'cus', 'mel', 'an', 'ox', 'phi', 'la', 'spi', 'za', 'ter', 'nu', 'gri',
+             'por', 'ae', 'thi', 'lo']
+
+
+def setup_django(use_env_db, tmp):
+    sys.path.insert(0, REPO_ROOT)
+    os.chdir(REPO_ROOT)
+    if not use_env_db:
+        os.environ['DB_ENGINE'] = 'django.db.backends.sqlite3'
+        os.environ['DB_NAME'] = os.path.join(tmp, 'bench.sqlite3')
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+    import django
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0, skip_checks=True)
+
+
+def latin(rng, syllables):
+    return ''.join(rng.choice(SYLLABLES) for _ in range(syllables))
+
+
+def seed(species, rng):
+    """Create species birds, with names built from common naming patterns"""
+    from birds.models import Bird
+
+    names = [f'{region} {trait} {bird}' for region in REGIONS for trait in TRAITS for bird in KINDS_OF_BIRD]
+    rng.shuffle(names)
+    # Past the 12,500 combinations, repeats get a fourth word
+    names += [f'{rng.choice(names)} {latin(rng, 2).title()}' for _ in range(species - len(names))]
+    genera = [latin(rng, 3).title() for _ in range(max(species // 20, 10))]
+    birds = Bird.objects.bulk_create(
+        (
+            Bird(
+                name=names[i], scientific_name=f'{rng.choice(genera)} {latin(rng, 3)}{i}', description='Seeded',
+                image_url='https://example.com/bird.jpg', conservation_status='LC', rarity=rng.choice('CBAS'),
+                global_distribution=rng.choice(['Europe and Asia', 'North America', 'Africa', 'South America'])
+            )
+            for i in range(species)
+        ),
+        batch_size=2000
+    )
+    return [(bird.pk, bird.name, bird.scientific_name) for bird in birds]
+
+
+def typo(word, rng):
+    i = rng.randrange(1, len(word) - 1)
+    edit = rng.choice(['drop', 'double', 'swap'])
+    if edit == 'drop':
+        return word[:i] + word[i + 1:]
+    if edit == 'double':
+        return word[:i] + word[i] + word[i:]
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def make_queries(birds, count, rng):
+    """(kind, query, pk of the bird it was drawn from)"""
+    queries = []
+    for kind in KINDS:
+        for pk, name, scientific_name in rng.sample(birds, count):
+            words = name.split()
+            if kind == 'exact':
+                query = name
+            elif kind == 'prefix':
+                query = rng.choice(words)[:4]
+            elif kind == 'typo':
+                query = f'{words[-2]} {typo(words[-1], rng)}'
+            elif kind == 'multiword':
+                i = rng.randrange(len(words) - 1)
+                query = f'{words[i]} {words[i + 1]}'
+            else:
+                query = scientific_name.split()[0]
+            queries.append((kind, query, pk))
+    return queries
+
+
+def icontains(query):
+    from django.db.models import Q
+    from birds.models import Bird
+
+    return Bird.objects.filter(Q(name__icontains=query) | Q(scientific_name__icontains=query)).order_by('name')
+
+
+def ranked(query):
+    from birds import search
+    from birds.models import Bird
+
+    return search.search(Bird.objects.all(), query, search.BIRD_FIELDS)
+
+
+def measure(build, queries):
+    by_kind = {kind: {'times': [], 'found': 0, 'empty': 0} for kind in KINDS}
+    for kind, query, pk in queries:
+        started = time.perf_counter()
+        page = list(build(query).values_list('pk', flat=True)[:PAGE])
+        by_kind[kind]['times'].append(time.perf_counter() - started)
+        by_kind[kind]['found'] += pk in page[:10]
+        by_kind[kind]['empty'] += not page
+    return {
+        kind: {
+            'p50_ms': statistics.median(result['times']) * 1000,
+            'p95_ms': sorted(result['times'])[int(len(result['times']) * 0.95) - 1] * 1000,
+            'recall_at_10': result['found'] / len(result['times']),
+            'empty': result['empty'] / len(result['times']),
+        }
+        for kind, result in by_kind.items()
+    }
+
+
+def run(species, query_count, rng):
+    from django.db import connection
+    from birds import search
+
+    birds = seed(species, rng)
+    queries = make_queries(birds, query_count, rng)
+    # Warm the connection and caches before timing
+    list(ranked(queries[0][1])[:PAGE])
+    old = measure(icontains, queries)
+    new = measure(ranked, queries)
+    return [
+        {
+            'species': species, 'kind': kind, 'vendor': connection.vendor,
+            'backend': type(search.get_backend()).__name__,
+            'icontains': old[kind], 'search': new[kind],
+        }
+        for kind in KINDS
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--species', default='10000', help='Comma-separated catalog sizes')
+    parser.add_argument('--queries', type=int, default=50, help='Queries per kind')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the generated catalog and queries')
+    parser.add_argument('--use-env-db', action='store_true', help='Use the DB_* settings instead of a temporary SQLite file')
+    parser.add_argument('--output', help='Write all results to this JSON file')
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(args.use_env_db, tmp)
+        from django.db import transaction
+
+        for species in [int(size) for size in args.species.split(',')]:
+            # Each catalog is rolled back, leaving the database as it was
+            with transaction.atomic():
+                for result in run(species, args.queries, random.Random(args.seed)):
+                    print(json.dumps(result), flush=True)
+                    results.append(result)
+                transaction.set_rollback(True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'queries': args.queries,
+                'results': results,
+            }, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
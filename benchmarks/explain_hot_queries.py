@@ -0,0 +1,275 @@
+"""
+EXPLAIN plans of the hot endpoint queries with and without their indexes.
+
+Seeds a throwaway SQLite database (or uses DB_* from the environment with
+--use-env-db) with skewed, realistic volumes: a few heavy users owning a
+large share of the activity, identifications and collections, a catalog
+where rare birds are rare, mostly unverified sightings and mostly used
+OTPs. The index plan's indexes are then dropped, each query is explained
+and timed, the indexes are recreated and analysed, and it is explained and
+timed again. Everything runs in a rolled-back transaction.
+
+Results are printed as JSON lines (plans as lists of lines), or written to
+--output.
+
+    python benchmarks/explain_hot_queries.py --rows 50000 --users 500
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (model, index name) for every index in the plan
+INDEXES = [
+    ('recent_activity.UserActivity', 'activity_user_created_idx'),
+    ('birds.BirdIdentification', 'birds_ident_user_created_idx'),
+    ('nearby.SpotBirdSighting', 'nearby_sighting_spot_date_idx'),
+    ('nearby.SpotBirdSighting', 'nearby_sighting_verified_idx'),
+    ('collection.UserCollection', 'collection_user_favorite_idx'),
+    ('birds.Bird', 'birds_bird_rarity_name_idx'),
+    ('discover.Article', 'discover_article_category_idx'),
+    ('authentication.OTP', 'auth_otp_unused_email_idx'),
+]
+
+CATEGORIES = ['Migration', 'Feeder Birds', 'Identification', 'Conservation', 'Habitats', 'Behaviour', 'Photography', 'Gear']
+
+
+def setup_django(use_env_db, tmp):
+    sys.path.insert(0, REPO_ROOT)
+    os.chdir(REPO_ROOT)
+    if not use_env_db:
+        os.environ['DB_ENGINE'] = 'django.db.backends.sqlite3'
+        os.environ['DB_NAME'] = os.path.join(tmp, 'bench.sqlite3')
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+    import django
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0, skip_checks=True)
+
+
+def owner(rng, users):
+    # A fifth of the rows belong to the first user, a fifth to the next few, the rest spread out
+    draw = rng.random()
+    if draw < 0.2:
+        return users[0]
+    if draw < 0.4:
+        return users[rng.randrange(1, min(5, len(users)))]
+    return rng.choice(users)
+
+
+def seed(rows, user_count, rng):
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+    from authentication.models import OTP
+    from birds.models import Bird, BirdIdentification
+    from collection.models import UserCollection
+    from discover.models import Article
+    from nearby.models import NearbySpot, SpotBirdSighting
+    from recent_activity.models import UserActivity
+
+    now = timezone.now()
+    today = now.date()
+    users = get_user_model().objects.bulk_create(
+        get_user_model()(email=f'explain{i}@example.com', username=f'explain{i}', password='!')
+        for i in range(user_count)
+    )
+    birds = Bird.objects.bulk_create(
+        Bird(
+            name=f"Bird {i:05d}", scientific_name=f"Avis explain{i}", description='Seeded',
+            image_url='https://example.com/bird.jpg', conservation_status='LC',
+            rarity=rng.choices('CBAS', weights=[60, 25, 10, 5])[0]
+        )
+        for i in range(max(rows // 100, 50))
+    )
+    spots = NearbySpot.objects.bulk_create(
+        NearbySpot(
+            name=f"Spot {i}", description='Seeded', latitude=51 + rng.random(), longitude=-1 + rng.random(),
+            created_by=rng.choice(users), is_verified=True
+        )
+        for i in range(max(rows // 500, 20))
+    )
+    UserActivity.objects.bulk_create(
+        (
+            UserActivity(
+                user=owner(rng, users), bird=rng.choice(birds), activity_type='identification',
+                description='Seeded', latitude=51.5, longitude=-0.1
+            )
+            for _ in range(rows)
+        ),
+        batch_size=2000
+    )
+    BirdIdentification.objects.bulk_create(
+        (
+            BirdIdentification(
+                user=owner(rng, users), bird=rng.choice(birds), identified_species='Seeded',
+                confidence_level=rng.uniform(10, 99), ai_response={}
+            )
+            for _ in range(rows)
+        ),
+        batch_size=2000
+    )
+    SpotBirdSighting.objects.bulk_create(
+        (
+            SpotBirdSighting(
+                spot=rng.choice(spots), bird=rng.choice(birds), reported_by=rng.choice(users),
+                sighting_date=today - datetime.timedelta(days=rng.randrange(730)),
+                is_verified=rng.random() < 0.05
+            )
+            for _ in range(rows)
+        ),
+        batch_size=2000
+    )
+    # The heavy user has collected every bird
+    per_user = min(len(birds), rows // len(users))
+    UserCollection.objects.bulk_create(
+        (
+            UserCollection(user=user, bird=bird, is_favorite=rng.random() < 0.1)
+            for user in users
+            for bird in (birds if user is users[0] else rng.sample(birds, per_user))
+        ),
+        batch_size=2000
+    )
+    articles = Article.objects.bulk_create(
+        (
+            Article(
+                title=f"Article {i}", content='Seeded', author='Seeder', image_url='https://example.com/a.jpg',
+                category=rng.choice(CATEGORIES), read_time=rng.randrange(1, 20), tags='seeded'
+            )
+            for i in range(max(rows // 10, 100))
+        ),
+        batch_size=2000
+    )
+    # created_at is auto_now_add, so spread it over three years afterwards
+    for article in articles:
+        article.created_at = now - datetime.timedelta(hours=rng.randrange(24 * 365 * 3))
+    Article.objects.bulk_update(articles, ['created_at'], batch_size=2000)
+    OTP.objects.bulk_create(
+        (
+            OTP(
+                email=f'explain{rng.randrange(user_count)}@example.com', otp=f'{rng.randrange(10 ** 6):06d}',
+                expires_at=now + datetime.timedelta(minutes=rng.randrange(-60 * 24 * 90, 10)),
+                is_used=rng.random() < 0.95
+            )
+            for _ in range(rows)
+        ),
+        batch_size=2000
+    )
+    return users[0]
+
+
+def cases(user):
+    """(name, endpoint, queryset) for each hot query, shaped the way its view builds it"""
+    from django.utils import timezone
+    from authentication.models import OTP
+    from birds.models import Bird, BirdIdentification
+    from collection.models import UserCollection
+    from discover.models import Article
+    from nearby.models import SpotBirdSighting
+    from recent_activity.models import UserActivity
+
+    busiest_spot = SpotBirdSighting.objects.values_list('spot', flat=True).first()
+    otp = OTP.objects.filter(is_used=False).order_by('-expires_at').first()
+    return [
+        ('activity_feed', 'recent-activity view-all',
+         UserActivity.objects.filter(user=user).order_by('-created_at', '-id')[:11]),
+        ('identification_feed', 'birds/identifications/',
+         BirdIdentification.objects.filter(user=user).order_by('-created_at', '-id')[:11]),
+        ('spot_sightings', 'nearby-bird-list',
+         SpotBirdSighting.objects.filter(spot_id=busiest_spot).order_by('-sighting_date')[:10]),
+        ('verified_sightings', 'nearby-bird-activity',
+         SpotBirdSighting.objects.filter(is_verified=True).select_related('spot')),
+        ('favorites', 'collection favorites',
+         UserCollection.objects.filter(user=user, is_favorite=True).order_by('-date_added')[:10]),
+        ('birds_by_rarity', 'birds/list/?rarity=S',
+         Bird.objects.filter(rarity='S').order_by('name')[:10]),
+        ('articles_by_category', 'discovery-learn?category=Migration',
+         Article.objects.filter(category='Migration').order_by('-created_at')),
+        ('otp_lookup', 'auth/verify-otp/',
+         OTP.objects.filter(email=otp.email, otp=otp.otp, is_used=False, expires_at__gt=timezone.now())[:1]),
+    ]
+
+
+def set_indexes(present):
+    """Create or drop every index in the plan, then refresh the planner statistics"""
+    from django.apps import apps
+    from django.db import connection
+
+    with connection.cursor() as cursor:
+        editor = connection.schema_editor()
+        for model_label, name in INDEXES:
+            model = apps.get_model(model_label)
+            index = next(index for index in model._meta.indexes if index.name == name)
+            sql = index.create_sql(model, editor) if present else index.remove_sql(model, editor)
+            cursor.execute(str(sql))
+        cursor.execute('ANALYZE')
+
+
+def measure(queryset, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        list(queryset.all())
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def run(user, repeat):
+    from django.db import connection
+
+    results = {}
+    for present in (False, True):
+        set_indexes(present)
+        for name, endpoint, queryset in cases(user):
+            result = results.setdefault(name, {'query': name, 'endpoint': endpoint, 'vendor': connection.vendor})
+            result['after' if present else 'before'] = {
+                'plan': queryset.explain().splitlines(),
+                'ms': measure(queryset, repeat) * 1000,
+            }
+    for result in results.values():
+        result['speedup'] = result['before']['ms'] / result['after']['ms']
+    return list(results.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=50000, help='Rows per large table (activity, identifications, sightings, OTPs)')
+    parser.add_argument('--users', type=int, default=500, help='Users to spread the rows over')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per query; the fastest is reported')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the generated data')
+    parser.add_argument('--use-env-db', action='store_true', help='Use the DB_* settings instead of a temporary SQLite file')
+    parser.add_argument('--output', help='Write all results to this JSON file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(args.use_env_db, tmp)
+        from django.db import transaction
+
+        # Seeding and the index changes are rolled back, leaving the database as it was
+        with transaction.atomic():
+            user = seed(args.rows, args.users, random.Random(args.seed))
+            results = run(user, args.repeat)
+            transaction.set_rollback(True)
+
+    for result in results:
+        print(json.dumps(result), flush=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'rows': args.rows,
+                'users': args.users,
+                'results': results,
+            }, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""
+Benchmark of the compiled list serializers in core/fast_serializers.py.
+
+Seeds a throwaway SQLite database (or uses DB_* from the environment with
+--use-env-db) and, for each serializer, times a full list render the way
+the views do it: DRF over an optimize_for_serializer() queryset against the
+compiled values() path. Both outputs are rendered with DRF's JSONRenderer
+and must be byte-identical. Results are printed as JSON lines, or written
+to --output.
+
+    python benchmarks/fast_serializers.py --rows 1000,5000 --repeat 5
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SERIALIZERS = [
+    ('birds.serializers.BirdListSerializer', 'birds.models.Bird'),
+    ('nearby.serializers.SpotBirdSightingSerializer', 'nearby.models.SpotBirdSighting'),
+    ('collection.serializers.UserCollectionSerializer', 'collection.models.UserCollection'),
+]
+
+
+def setup_django(use_env_db, tmp):
+    sys.path.insert(0, REPO_ROOT)
+    os.chdir(REPO_ROOT)
+    if not use_env_db:
+        os.environ['DB_ENGINE'] = 'django.db.backends.sqlite3'
+        os.environ['DB_NAME'] = os.path.join(tmp, 'bench.sqlite3')
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+    import django
+    django.setup()
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0, skip_checks=True)
+
+
+def import_string(path):
+    from django.utils.module_loading import import_string as django_import_string
+    return django_import_string(path)
+
+
+def seed(rows, images_per_bird):
+    from birds.models import Bird, BirdImage
+    from core.testing import seed_query_budget_data
+
+    user = seed_query_budget_data(rows=rows)
+    BirdImage.objects.bulk_create(
+        BirdImage(bird=bird, image_url=f'https://example.com/{bird.pk}/{i}.jpg', is_primary=i == 0)
+        for bird in Bird.objects.all()
+        for i in range(images_per_bird)
+    )
+    return user
+
+
+def best_of(repeat, fn):
+    times = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+    return min(times), result
+
+
+def run(rows, repeat):
+    from rest_framework.renderers import JSONRenderer
+    from core.fast_serializers import compile_serializer
+    from core.querysets import optimize_for_serializer
+
+    renderer = JSONRenderer()
+    results = []
+    for serializer_path, model_path in SERIALIZERS:
+        serializer_class = import_string(serializer_path)
+        queryset = import_string(model_path).objects.order_by('pk')
+        compiled = compile_serializer(serializer_class)
+
+        drf_time, drf_json = best_of(repeat, lambda: renderer.render(
+            serializer_class(optimize_for_serializer(queryset, serializer_class()), many=True).data
+        ))
+        compiled_time, compiled_json = best_of(repeat, lambda: renderer.render(compiled(queryset)))
+        if drf_json != compiled_json:
+            raise SystemExit(f"{serializer_path}: compiled output differs from DRF")
+
+        count = queryset.count()
+        results.append({
+            'serializer': serializer_path,
+            'rows': count,
+            'json_bytes': len(drf_json),
+            'drf_rows_per_s': count / drf_time,
+            'compiled_rows_per_s': count / compiled_time,
+            'speedup': drf_time / compiled_time,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', default='1000', help='Rows to seed (birds, sightings and collection entries)')
+    parser.add_argument('--images-per-bird', type=int, default=2, help='Nested images per bird')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per serializer; the fastest is reported')
+    parser.add_argument('--use-env-db', action='store_true', help='Use the DB_* settings instead of a temporary SQLite file')
+    parser.add_argument('--output', help='Write all results to this JSON file')
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_django(args.use_env_db, tmp)
+        from django.db import transaction
+
+        for rows in [int(r) for r in args.rows.split(',')]:
+            # Seed inside a rolled-back transaction so each size starts from an empty database
+            with transaction.atomic():
+                seed(rows, args.images_per_bird)
+                for result in run(rows, args.repeat):
+                    results.append(result)
+                    print(json.dumps(result), flush=True)
+                transaction.set_rollback(True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'results': results,
+            }, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
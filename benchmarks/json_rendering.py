@@ -0,0 +1,155 @@
+"""
+Benchmark of core/renderers.py and core/parsers.py against DRF's stdlib JSON
+renderer and parser.
+
+Builds payloads shaped like our responses: a page of bird details with the
+long text fields, a large collection list with nested birds and
+datetimes, and subscription plans with Decimal prices and lazy strings.
+Each is rendered and parsed with both implementations, and the rendered
+bytes are compared. Results are printed as JSON lines, or written to
+--output.
+
+    python benchmarks/json_rendering.py --rows 10,100,1000 --repeat 20
+"""
+import argparse
+import datetime
+import decimal
+import io
+import json
+import os
+import platform
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LOREM = (
+    "Forages in dense undergrowth and along woodland edges, turning over leaf litter "
+    "for insects and seeds. Pairs defend territories year-round and sing from exposed perches. "
+)
+
+
+def setup_django():
+    sys.path.insert(0, REPO_ROOT)
+    import django
+    from django.conf import settings
+
+    settings.configure(USE_TZ=True, USE_I18N=True, INSTALLED_APPS=['rest_framework'])
+    django.setup()
+
+
+def bird(i):
+    return {
+        'id': i,
+        'name': f"Bird {i}",
+        'scientific_name': f"Avis example{i}",
+        'description': LOREM * 6,
+        'image_url': f"https://cdn.example.com/birds/{i}.jpg",
+        'rarity': 'ABCS'[i % 4],
+        'conservation_status': 'LC',
+        'habitat': LOREM * 3,
+        'behavior': LOREM * 4,
+        'feeding_habits': LOREM * 2,
+        'breeding_info': LOREM * 2,
+        'images': [{'id': i * 10 + k, 'image_url': f"https://cdn.example.com/birds/{i}/{k}.jpg", 'is_primary': k == 0} for k in range(3)],
+        'sounds': [{'id': i, 'sound_url': f"https://cdn.example.com/sounds/{i}.mp3", 'sound_type': 'song', 'description': LOREM}],
+    }
+
+
+def payloads(rows):
+    from django.utils import timezone
+    from django.utils.translation import gettext_lazy
+
+    now = timezone.now()
+    return {
+        'bird_details': {'count': rows, 'next': None, 'previous': None, 'results': [bird(i) for i in range(rows)]},
+        'collection': [
+            {
+                'id': i,
+                'bird': bird(i),
+                'is_favorite': i % 3 == 0,
+                'date_added': now - datetime.timedelta(hours=i),
+                'notes': LOREM,
+                'latitude': 51.5 + i / 1000,
+                'longitude': -0.12 - i / 1000,
+                'location_name': 'Regent’s Park',
+            }
+            for i in range(rows)
+        ],
+        'subscription_plans': [
+            {
+                'id': i,
+                'name': gettext_lazy('Premium'),
+                'price': decimal.Decimal('9.99') * (i + 1),
+                'interval': 'month',
+                'features': [gettext_lazy('Unlimited identifications'), gettext_lazy('Offline field guide')],
+                'created_at': now,
+            }
+            for i in range(rows)
+        ],
+    }
+
+
+def best_of(repeat, fn):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def run(rows, repeat):
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+    from core.parsers import FastJSONParser
+    from core.renderers import FastJSONRenderer, orjson
+
+    results = []
+    for name, data in payloads(rows).items():
+        stdlib_bytes = JSONRenderer().render(data)
+        fast_bytes = FastJSONRenderer().render(data)
+        render_stdlib = best_of(repeat, lambda: JSONRenderer().render(data))
+        render_fast = best_of(repeat, lambda: FastJSONRenderer().render(data))
+        parse_stdlib = best_of(repeat, lambda: JSONParser().parse(io.BytesIO(stdlib_bytes)))
+        parse_fast = best_of(repeat, lambda: FastJSONParser().parse(io.BytesIO(stdlib_bytes)))
+        megabytes = len(stdlib_bytes) / 1e6
+        results.append({
+            'payload': name,
+            'rows': rows,
+            'bytes': len(stdlib_bytes),
+            'orjson': orjson is not None,
+            'identical': stdlib_bytes == fast_bytes,
+            'render_mb_per_s': {'stdlib': megabytes / render_stdlib, 'fast': megabytes / render_fast},
+            'parse_mb_per_s': {'stdlib': megabytes / parse_stdlib, 'fast': megabytes / parse_fast},
+            'render_speedup': render_stdlib / render_fast,
+            'parse_speedup': parse_stdlib / parse_fast,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', default='10,100,1000', help='Comma-separated rows per payload')
+    parser.add_argument('--repeat', type=int, default=20, help='Runs per case; the fastest is reported')
+    parser.add_argument('--output', help='Write all results to this JSON file')
+    args = parser.parse_args()
+
+    setup_django()
+    results = []
+    for rows in [int(r) for r in args.rows.split(',')]:
+        for result in run(rows, args.repeat):
+            results.append(result)
+            print(json.dumps(result), flush=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'results': results,
+            }, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
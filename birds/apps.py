@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class BirdsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'birds'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import search, signals  # noqa: F401
+        connection_created.connect(search.configure_connection)
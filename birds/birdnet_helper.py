@@ -5,38 +5,353 @@ os.environ['CUDA_VISIBLE_DEVICES'] = ''
 try:
     import tflite_runtime.interpreter as tflite
 except ImportError:
-    from tensorflow import lite as tflite
+    try:
+        from tensorflow import lite as tflite
+    except ImportError:
+        # Only the stub interpreter (BIRDNET_STUB_INTERPRETER) is usable without a runtime
+        tflite = None
 
 import librosa
 import numpy as np
+import soundfile
+from scipy import signal as scipy_signal
+import contextlib
+import functools
+import copy
+import hashlib
+import json
+import logging
 import math
-import operator
+import multiprocessing
+import queue
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 
 # Paths to BirdNET model and labels
 BIRDNET_MODEL_PATH = os.path.join('birds', 'birdnet-models', 'BirdNET_6K_GLOBAL_MODEL.tflite')
 BIRDNET_LABELS_PATH = os.path.join('birds', 'birdnet-models', 'labels.txt')
+# Compiled label table (see compile_label_table / manage.py compile_birdnet_labels)
+BIRDNET_LABEL_TABLE_PATH = os.getenv(
+    'BIRDNET_LABEL_TABLE_PATH',
+    os.path.join('birds', 'birdnet-models', 'labels.npy')
+)
+NON_BIRD_LABELS = {'Human_Human', 'Noise_Noise', 'Non-Bird_Non-Bird'}
+# Optional BirdNET metadata (species range) model used for the location/week filter
+BIRDNET_MDATA_MODEL_PATH = os.getenv(
+    'BIRDNET_MDATA_MODEL_PATH',
+    os.path.join('birds', 'birdnet-models', 'BirdNET_6K_GLOBAL_MDATA_MODEL.tflite')
+)
+
+# Location/week species filter settings
+LOCATION_FILTER_THRESHOLD = float(os.getenv('BIRDNET_LOCATION_FILTER_THRESHOLD', '0.03'))
+LOCATION_GRID_DEGREES = float(os.getenv('BIRDNET_LOCATION_GRID_DEGREES', '1.0'))
+LOCATION_FILTER_CACHE_SIZE = int(os.getenv('BIRDNET_LOCATION_FILTER_CACHE_SIZE', '1024'))
+
+# Use StubInterpreter instead of the real model (benchmarks, environments without the model)
+STUB_INTERPRETER = os.getenv('BIRDNET_STUB_INTERPRETER', 'False') == 'True'
+
+# Interpreter pool settings
+INTERPRETER_POOL_SIZE = int(os.getenv('BIRDNET_POOL_SIZE', os.cpu_count() or 1))
+INTERPRETER_NUM_THREADS = int(os.getenv('BIRDNET_NUM_THREADS', '1'))
+INTERPRETER_CHECKOUT_TIMEOUT = float(os.getenv('BIRDNET_CHECKOUT_TIMEOUT', '30'))
+
+# Long recordings are split into contiguous shards analysed by a process pool
+SHARD_WORKERS = int(os.getenv('BIRDNET_SHARD_WORKERS', '1'))
+SHARD_MIN_SECONDS = float(os.getenv('BIRDNET_SHARD_MIN_SECONDS', '300'))
+
+# Decoded audio cache (memory-mapped .npy files keyed by file hash)
+AUDIO_CACHE_DIR = os.getenv('BIRDNET_AUDIO_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'birdnet-audio-cache'))
+AUDIO_CACHE_SIZE = int(os.getenv('BIRDNET_AUDIO_CACHE_SIZE', '32'))
+
+# Silence gate: windows whose bird-band energy and spectral flux stay close
+# to the recording's noise floor are not sent through the model. Windows
+# louder than BIRDNET_GATE_LEVEL_DBFS in the band always are, recordings
+# shorter than BIRDNET_GATE_MIN_WINDOWS are not gated, and a recording is
+# never gated down to nothing.
+SILENCE_GATE_ENABLED = os.getenv('BIRDNET_SILENCE_GATE', 'True') == 'True'
+SILENCE_GATE_BAND = (
+    float(os.getenv('BIRDNET_GATE_MIN_FREQ', '1000')),
+    float(os.getenv('BIRDNET_GATE_MAX_FREQ', '10000')),
+)
+SILENCE_GATE_RATIO = float(os.getenv('BIRDNET_GATE_RATIO', '4.0'))
+SILENCE_GATE_LEVEL_DBFS = float(os.getenv('BIRDNET_GATE_LEVEL_DBFS', '-50'))
+SILENCE_GATE_MIN_WINDOWS = int(os.getenv('BIRDNET_GATE_MIN_WINDOWS', '10'))
+SILENCE_GATE_FLOOR = 1e-5
+
+# Identification result cache: bounded in memory, optionally persisted as JSON files
+RESULT_CACHE_SIZE = int(os.getenv('BIRDNET_RESULT_CACHE_SIZE', '256'))
+RESULT_CACHE_DIR = os.getenv('BIRDNET_RESULT_CACHE_DIR', '')
+
+logger = logging.getLogger(__name__)
 
 # Cache model and labels to avoid reloading for every request
 _birdnet_cache = {}
 
-def load_birdnet_model():
-    if 'interpreter' in _birdnet_cache:
-        return _birdnet_cache['interpreter'], _birdnet_cache['input_layer_index'], _birdnet_cache['mdata_input_index'], _birdnet_cache['output_layer_index'], _birdnet_cache['classes']
-    interpreter = tflite.Interpreter(model_path=BIRDNET_MODEL_PATH)
+def load_birdnet_labels():
+    if 'classes' not in _birdnet_cache:
+        with open(BIRDNET_LABELS_PATH, 'r') as lfile:
+            _birdnet_cache['classes'] = [line.strip() for line in lfile.readlines()]
+    return _birdnet_cache['classes']
+
+def compile_label_table(labels_path=BIRDNET_LABELS_PATH, output_path=BIRDNET_LABEL_TABLE_PATH, bird_ids=None):
+    """
+    Compile labels.txt into a fixed-width structured array saved as .npy:
+    scientific name, common name, class index, non-bird flag and the
+    matching Bird primary key (-1 when there is none). bird_ids maps
+    lower-cased scientific names to Bird ids.
+    """
+    bird_ids = bird_ids or {}
+    with open(labels_path, 'r') as lfile:
+        labels = [line.strip() for line in lfile.readlines()]
+    names = [split_label(label) for label in labels]
+    sci_width = max([len(sci.encode()) for sci, _ in names] + [1])
+    common_width = max([len(common.encode()) for _, common in names] + [1])
+    table = np.zeros(len(labels), dtype=[
+        ('scientific_name', f'S{sci_width}'),
+        ('common_name', f'S{common_width}'),
+        ('class_index', '<i4'),
+        ('non_bird', '?'),
+        ('bird_id', '<i8'),
+    ])
+    table['scientific_name'] = [sci.encode() for sci, _ in names]
+    table['common_name'] = [common.encode() for _, common in names]
+    table['class_index'] = np.arange(len(labels))
+    table['non_bird'] = [label in NON_BIRD_LABELS for label in labels]
+    table['bird_id'] = [bird_ids.get(sci.lower(), -1) for sci, _ in names]
+    if output_path:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(output_path) or '.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, table)
+            # mkstemp creates 0600 files; the server may not run as whoever compiled the table
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, output_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    return table
+
+def load_label_table():
+    """
+    Compiled label table, memory-mapped so every worker process shares the
+    same pages. Compiled on the fly (without Bird ids) when missing or older
+    than labels.txt.
+    """
+    if 'label_table' not in _birdnet_cache:
+        path = BIRDNET_LABEL_TABLE_PATH
+        try:
+            if not (os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(BIRDNET_LABELS_PATH)):
+                compile_label_table(output_path=path)
+            table = np.load(path, mmap_mode='r')
+        except OSError:
+            # Unreadable or unwritable table file: compile in memory instead
+            logger.warning("BirdNET label table %s is not usable; compiling it in memory", path, exc_info=True)
+            table = compile_label_table(output_path=None)
+        _birdnet_cache['label_table'] = table
+    return _birdnet_cache['label_table']
+
+def species_info(class_index):
+    """O(1) lookup of a class index in the compiled label table"""
+    row = load_label_table()[class_index]
+    bird_id = int(row['bird_id'])
+    return {
+        'scientific_name': row['scientific_name'].decode(),
+        'common_name': row['common_name'].decode(),
+        'class_index': int(row['class_index']),
+        'non_bird': bool(row['non_bird']),
+        'bird_id': bird_id if bird_id >= 0 else None,
+    }
+
+class StubInterpreter:
+    """
+    Stand-in with the tflite Interpreter API returning deterministic random
+    logits, so the audio pipeline can be exercised and benchmarked where the
+    real BirdNET model is not available.
+    """
+
+    def __init__(self, n_classes, sample_length=144000, seed=0):
+        self.n_classes = n_classes
+        self.sample_length = sample_length
+        self._rng = np.random.default_rng(seed)
+        self._tensors = {}
+
+    def allocate_tensors(self):
+        pass
+
+    def get_input_details(self):
+        return [
+            {'index': 0, 'shape': np.array([1, self.sample_length]), 'dtype': np.float32},
+            {'index': 1, 'shape': np.array([1, 6]), 'dtype': np.float32},
+        ]
+
+    def get_output_details(self):
+        return [{'index': 2, 'shape': np.array([1, self.n_classes]), 'dtype': np.float32}]
+
+    def set_tensor(self, index, value):
+        self._tensors[index] = value
+
+    def invoke(self):
+        self._tensors[2] = self._rng.normal(-4.0, 2.0, size=(1, self.n_classes)).astype('float32')
+
+    def get_tensor(self, index):
+        return self._tensors[index]
+
+def create_interpreter(num_threads=INTERPRETER_NUM_THREADS):
+    """Create an allocated interpreter and return it with its tensor indices"""
+    if STUB_INTERPRETER:
+        interpreter = StubInterpreter(len(load_birdnet_labels()))
+    elif tflite is None:
+        raise ImportError("BirdNET needs tflite_runtime or tensorflow to be installed")
+    else:
+        interpreter = tflite.Interpreter(model_path=BIRDNET_MODEL_PATH, num_threads=num_threads)
     interpreter.allocate_tensors()
     input_details = interpreter.get_input_details()
     output_details = interpreter.get_output_details()
     input_layer_index = input_details[0]['index']
     mdata_input_index = input_details[1]['index']
     output_layer_index = output_details[0]['index']
-    with open(BIRDNET_LABELS_PATH, 'r') as lfile:
-        classes = [line.strip() for line in lfile.readlines()]
-    _birdnet_cache['interpreter'] = interpreter
-    _birdnet_cache['input_layer_index'] = input_layer_index
-    _birdnet_cache['mdata_input_index'] = mdata_input_index
-    _birdnet_cache['output_layer_index'] = output_layer_index
-    _birdnet_cache['classes'] = classes
-    return interpreter, input_layer_index, mdata_input_index, output_layer_index, classes
+    return interpreter, input_layer_index, mdata_input_index, output_layer_index
+
+def load_birdnet_model():
+    """Single shared interpreter; not safe for concurrent use, see InterpreterPool"""
+    if 'interpreter' not in _birdnet_cache:
+        _birdnet_cache['interpreter'] = create_interpreter()
+    return (*_birdnet_cache['interpreter'], load_birdnet_labels())
+
+class InterpreterPool:
+    """
+    Bounded pool of pre-allocated BirdNET interpreters. A TFLite interpreter
+    must not be invoked from two threads at once, so each request checks one
+    out for the duration of its inference and returns it afterwards.
+    """
+
+    def __init__(self, size=INTERPRETER_POOL_SIZE, num_threads=INTERPRETER_NUM_THREADS):
+        self.size = max(1, size)
+        self.num_threads = num_threads
+        self._available = queue.Queue(maxsize=self.size)
+        for _ in range(self.size):
+            self._available.put(create_interpreter(num_threads))
+        self._lock = threading.Lock()
+        self._created_at = time.monotonic()
+        self._in_use = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._busy_total = 0.0
+
+    @contextlib.contextmanager
+    def checkout(self, timeout=INTERPRETER_CHECKOUT_TIMEOUT):
+        """Borrow an interpreter, blocking up to timeout seconds for one to free up"""
+        started = time.monotonic()
+        try:
+            model = self._available.get(timeout=timeout)
+        except queue.Empty:
+            with self._lock:
+                self._timeouts += 1
+            raise TimeoutError(f"No BirdNET interpreter became available within {timeout}s")
+        acquired = time.monotonic()
+        waited = acquired - started
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        try:
+            yield model
+        finally:
+            with self._lock:
+                self._in_use -= 1
+                self._busy_total += time.monotonic() - acquired
+            self._available.put(model)
+
+    def metrics(self):
+        with self._lock:
+            uptime = time.monotonic() - self._created_at
+            return {
+                'size': self.size,
+                'num_threads': self.num_threads,
+                'in_use': self._in_use,
+                'available': self.size - self._in_use,
+                'checkouts': self._checkouts,
+                'timeouts': self._timeouts,
+                'wait_time_total': self._wait_total,
+                'wait_time_avg': self._wait_total / self._checkouts if self._checkouts else 0.0,
+                'wait_time_max': self._wait_max,
+                'utilization': self._busy_total / (self.size * uptime) if uptime > 0 else 0.0,
+            }
+
+_pool_lock = threading.Lock()
+
+def get_interpreter_pool():
+    if 'pool' not in _birdnet_cache:
+        with _pool_lock:
+            if 'pool' not in _birdnet_cache:
+                _birdnet_cache['pool'] = InterpreterPool()
+    return _birdnet_cache['pool']
+
+def interpreter_pool_metrics():
+    pool = _birdnet_cache.get('pool')
+    return pool.metrics() if pool is not None else None
+
+# Guards loading the range model as well as each invoke() on it
+_mdata_lock = threading.Lock()
+
+def load_mdata_model():
+    """Load the species range model, or return None when it is not installed"""
+    if 'mdata_interpreter' not in _birdnet_cache:
+        with _mdata_lock:
+            if 'mdata_interpreter' not in _birdnet_cache:
+                model = None
+                if not STUB_INTERPRETER and tflite is not None and os.path.exists(BIRDNET_MDATA_MODEL_PATH):
+                    interpreter = tflite.Interpreter(model_path=BIRDNET_MDATA_MODEL_PATH)
+                    interpreter.allocate_tensors()
+                    model = (
+                        interpreter,
+                        interpreter.get_input_details()[0]['index'],
+                        interpreter.get_output_details()[0]['index'],
+                    )
+                _birdnet_cache['mdata_interpreter'] = model
+    return _birdnet_cache['mdata_interpreter']
+
+def location_cell(lat, lon):
+    """Grid cell a coordinate falls into, used as the species filter cache key"""
+    return int(math.floor(lat / LOCATION_GRID_DEGREES)), int(math.floor(lon / LOCATION_GRID_DEGREES))
+
+@functools.lru_cache(maxsize=LOCATION_FILTER_CACHE_SIZE)
+def _species_mask(lat_cell, lon_cell, week):
+    model = load_mdata_model()
+    if model is None:
+        return None
+    interpreter, input_index, output_index = model
+    # Query the range model at the centre of the cell
+    lat = (lat_cell + 0.5) * LOCATION_GRID_DEGREES
+    lon = (lon_cell + 0.5) * LOCATION_GRID_DEGREES
+    with _mdata_lock:
+        interpreter.set_tensor(input_index, np.array([[lat, lon, week]], dtype='float32'))
+        interpreter.invoke()
+        occurrence = interpreter.get_tensor(output_index)[0]
+    mask = occurrence >= LOCATION_FILTER_THRESHOLD
+    mask.setflags(write=False)
+    return mask
+
+def species_filter(lat, lon, week):
+    """
+    Boolean mask of the classes that plausibly occur at lat/lon in the given
+    week, or None when no location is known or the range model is missing.
+    Masks are computed once per (grid cell, week) and kept in a bounded LRU.
+    """
+    if lat == -1 or lon == -1:
+        return None
+    lat_cell, lon_cell = location_cell(lat, lon)
+    return _species_mask(lat_cell, lon_cell, int(week))
+
+species_filter_cache_info = _species_mask.cache_info
+species_filter_cache_clear = _species_mask.cache_clear
 
 def split_signal(sig, rate, overlap, seconds=3.0, minlen=1.5):
     sig_splits = []
@@ -51,9 +366,107 @@ def split_signal(sig, rate, overlap, seconds=3.0, minlen=1.5):
         sig_splits.append(split)
     return sig_splits
 
-def read_audio_data(path, overlap, sample_rate=48000):
-    sig, rate = librosa.load(path, sr=sample_rate, mono=True, res_type='kaiser_fast')
-    chunks = split_signal(sig, rate, overlap)
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def resample(sig, rate, target_rate):
+    if rate == target_rate:
+        return sig
+    g = math.gcd(int(rate), int(target_rate))
+    up, down = target_rate // g, rate // g
+    # Polyphase filtering is much cheaper than kaiser_fast for small ratios
+    # such as 44.1 kHz -> 48 kHz (160/147)
+    if max(up, down) <= 1000:
+        return scipy_signal.resample_poly(sig, up, down).astype('float32')
+    return librosa.resample(sig, orig_sr=rate, target_sr=target_rate, res_type='kaiser_fast')
+
+def audio_duration(path):
+    """Duration in seconds read from the file header, without decoding"""
+    try:
+        return soundfile.info(path).duration
+    except RuntimeError:
+        return librosa.get_duration(path=path)
+
+def decode_audio(path, sample_rate=48000):
+    """Decode to mono float32 at sample_rate, resampling only when the native rate differs"""
+    try:
+        sig, rate = soundfile.read(path, dtype='float32', always_2d=True)
+        sig = sig.mean(axis=1)
+    except RuntimeError:
+        # Containers libsndfile cannot read (e.g. m4a) are decoded by librosa at native rate
+        sig, rate = librosa.load(path, sr=None, mono=True)
+    return np.ascontiguousarray(resample(sig, rate, sample_rate), dtype='float32')
+
+class DecodedAudioCache:
+    """
+    Small LRU of decoded signals stored as .npy files and loaded memory-mapped,
+    so re-analysing a file with different parameters skips decode/resample.
+    """
+
+    def __init__(self, directory=AUDIO_CACHE_DIR, size=AUDIO_CACHE_SIZE):
+        self.directory = directory
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        existing = [
+            os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.npy')
+        ]
+        for path in sorted(existing, key=os.path.getmtime)[-size:]:
+            self._entries[os.path.basename(path)[:-4]] = path
+
+    def get(self, key):
+        with self._lock:
+            path = self._entries.get(key)
+            if path is None:
+                return None
+            self._entries.move_to_end(key)
+        try:
+            return np.load(path, mmap_mode='r')
+        except (FileNotFoundError, ValueError):
+            with self._lock:
+                self._entries.pop(key, None)
+            return None
+
+    def put(self, key, sig):
+        path = os.path.join(self.directory, f"{key}.npy")
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, sig)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._entries[key] = path
+            self._entries.move_to_end(key)
+            evicted = []
+            while len(self._entries) > self.size:
+                evicted.append(self._entries.popitem(last=False)[1])
+        for old_path in evicted:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(old_path)
+
+def get_audio_cache():
+    if 'audio_cache' not in _birdnet_cache:
+        _birdnet_cache['audio_cache'] = DecodedAudioCache()
+    return _birdnet_cache['audio_cache']
+
+def load_audio(path, sample_rate=48000, audio_hash=None):
+    if AUDIO_CACHE_SIZE <= 0:
+        return decode_audio(path, sample_rate)
+    cache = get_audio_cache()
+    key = f"{audio_hash or file_hash(path)}-{sample_rate}"
+    sig = cache.get(key)
+    if sig is None:
+        sig = decode_audio(path, sample_rate)
+        cache.put(key, sig)
+    return sig
+
+def read_audio_data(path, overlap, sample_rate=48000, audio_hash=None):
+    sig = load_audio(path, sample_rate, audio_hash)
+    chunks = split_signal(sig, sample_rate, overlap)
     return chunks
 
 def convert_metadata(m):
@@ -71,18 +484,178 @@ def convert_metadata(m):
 def custom_sigmoid(x, sensitivity=1.0):
     return 1 / (1.0 + np.exp(-sensitivity * x))
 
-def predict(sample, interpreter, input_layer_index, mdata_input_index, output_layer_index, classes, sensitivity):
+def invoke_model(sample, interpreter, input_layer_index, mdata_input_index, output_layer_index):
     interpreter.set_tensor(input_layer_index, np.array(sample[0], dtype='float32'))
     interpreter.set_tensor(mdata_input_index, np.array(sample[1], dtype='float32'))
     interpreter.invoke()
-    prediction = interpreter.get_tensor(output_layer_index)[0]
+    return interpreter.get_tensor(output_layer_index)[0]
+
+def predict(sample, interpreter, input_layer_index, mdata_input_index, output_layer_index, classes, sensitivity, species_mask=None):
+    prediction = invoke_model(sample, interpreter, input_layer_index, mdata_input_index, output_layer_index)
+    return [(classes[i], score) for i, score in postprocess_prediction(prediction, sensitivity, species_mask)]
+
+def postprocess_prediction(prediction, sensitivity, species_mask=None, top=10):
+    """Turn raw model logits into the best (class index, score) pairs"""
     p_sigmoid = custom_sigmoid(prediction, sensitivity)
-    p_labels = dict(zip(classes, p_sigmoid))
-    p_sorted = sorted(p_labels.items(), key=operator.itemgetter(1), reverse=True)
-    for i in range(min(10, len(p_sorted))):
-        if p_sorted[i][0] in ['Human_Human', 'Non-bird_Non-bird', 'Noise_Noise']:
-            p_sorted[i] = (p_sorted[i][0], 0.0)
-    return p_sorted[:10]
+    # Drop species that do not occur at this location/week before ranking
+    if species_mask is not None and len(species_mask) == len(p_sigmoid):
+        p_sigmoid = np.where(species_mask, p_sigmoid, 0.0)
+    # Stable descending order, ties keep label order
+    order = np.argsort(-p_sigmoid, kind='stable')[:top]
+    non_bird = load_label_table()['non_bird']
+    return [
+        (int(i), p_sigmoid.dtype.type(0.0) if non_bird[i] else p_sigmoid[i])
+        for i in order
+    ]
+
+def predict_chunks(chunks, model, mdata, sensitivity, species_mask=None):
+    """Per-chunk lists of (class index, score), in chunk order"""
+    chunk_preds = []
+    for c in chunks:
+        sig = np.expand_dims(c, 0)
+        prediction = invoke_model([sig, mdata], *model)
+        chunk_preds.append(postprocess_prediction(prediction, sensitivity, species_mask))
+    return chunk_preds
+
+def _predict_shard(chunks, mdata, sensitivity, species_mask):
+    # Runs in a worker process, which keeps its own interpreter between shards
+    interpreter, input_layer_index, mdata_input_index, output_layer_index, _ = load_birdnet_model()
+    model = (interpreter, input_layer_index, mdata_input_index, output_layer_index)
+    return predict_chunks(chunks, model, mdata, sensitivity, species_mask)
+
+_shard_executor_lock = threading.Lock()
+
+def get_shard_executor(workers):
+    executor = _birdnet_cache.get('shard_executor')
+    if executor is None or _birdnet_cache.get('shard_workers') != workers:
+        with _shard_executor_lock:
+            executor = _birdnet_cache.get('shard_executor')
+            if executor is None or _birdnet_cache.get('shard_workers') != workers:
+                if executor is not None:
+                    executor.shutdown(wait=False)
+                # spawn rather than fork: the parent is usually a threaded web server
+                executor = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                _birdnet_cache['shard_executor'] = executor
+                _birdnet_cache['shard_workers'] = workers
+    return executor
+
+def predict_sharded(chunks, mdata, sensitivity, species_mask, workers):
+    """
+    Split the chunk list into contiguous shards, analyse them in parallel and
+    concatenate the predictions in shard order, so the result is identical
+    to a serial run over the same chunks.
+    """
+    shards = [shard for shard in np.array_split(np.stack(chunks).astype('float32'), workers) if len(shard)]
+    executor = get_shard_executor(workers)
+    futures = [executor.submit(_predict_shard, shard, mdata, sensitivity, species_mask) for shard in shards]
+    chunk_preds = []
+    for future in futures:
+        chunk_preds.extend(future.result())
+    return chunk_preds
+
+def week_of_year(date):
+    """BirdNET week (1-48, four weeks per month) for a date"""
+    return (date.month - 1) * 4 + min(4, (date.day - 1) // 7 + 1)
+
+def split_label(label):
+    """Split a 'Scientific name_Common name' label into its two parts"""
+    scientific_name, _, common_name = label.partition('_')
+    return scientific_name, common_name or scientific_name
+
+def window_activity(chunks, rate=48000, band=SILENCE_GATE_BAND, frame_length=960, block=64):
+    """
+    Per-window activity features: peak RMS energy, peak positive spectral
+    flux and peak level in dBFS (a full-scale sine is 0 dBFS) of short
+    frames, restricted to the bird band. Computed in blocks of windows so
+    long recordings stay within bounded memory.
+    """
+    freqs = np.fft.rfftfreq(frame_length, 1.0 / rate)
+    in_band = (freqs >= band[0]) & (freqs <= band[1])
+    window_fn = np.hanning(frame_length).astype('float32')
+    # Parseval: mean square of the band signal from its one-sided windowed spectrum
+    level_scale = 2.0 * frame_length / float(np.sum(window_fn ** 2))
+    frame_energy, peak_energy, peak_flux, peak_level = [], [], [], []
+    for start in range(0, len(chunks), block):
+        windows = np.stack(chunks[start:start + block]).astype('float32')
+        n_frames = windows.shape[1] // frame_length
+        frames = windows[:, :n_frames * frame_length].reshape(len(windows), n_frames, frame_length)
+        spectrum = np.abs(np.fft.rfft(frames * window_fn, axis=-1))[..., in_band] / frame_length
+        energy = np.sqrt(np.mean(spectrum ** 2, axis=-1))
+        flux = np.maximum(np.diff(spectrum, axis=1), 0.0).mean(axis=-1)
+        frame_energy.append(energy.ravel())
+        peak_energy.append(energy.max(axis=1))
+        peak_flux.append(flux.max(axis=1))
+        mean_square = level_scale * np.sum(spectrum ** 2, axis=-1).max(axis=1)
+        peak_level.append(10 * np.log10(np.maximum(mean_square / 0.5, 1e-12)))
+    return (
+        np.concatenate(frame_energy), np.concatenate(peak_energy),
+        np.concatenate(peak_flux), np.concatenate(peak_level)
+    )
+
+def silence_gate(chunks, rate=48000, ratio=SILENCE_GATE_RATIO):
+    """
+    Boolean array of windows worth running through the model. The threshold
+    adapts to each recording: a window passes when its peak band energy or
+    spectral flux exceeds ratio times the recording's noise floor (low
+    percentile of frame energies / window fluxes), or when its band level
+    reaches SILENCE_GATE_LEVEL_DBFS. A recording can't be judged against
+    itself when it is short or sound throughout, so recordings of fewer
+    than SILENCE_GATE_MIN_WINDOWS windows, and recordings where no window
+    passes, keep every window.
+    """
+    if len(chunks) < SILENCE_GATE_MIN_WINDOWS:
+        return np.ones(len(chunks), dtype=bool)
+    frame_energy, peak_energy, peak_flux, peak_level = window_activity(chunks, rate)
+    energy_floor = max(np.percentile(frame_energy, 10), SILENCE_GATE_FLOOR)
+    flux_floor = max(np.percentile(peak_flux, 10), SILENCE_GATE_FLOOR)
+    active = (
+        (peak_energy > ratio * energy_floor) | (peak_flux > ratio * flux_floor)
+        | (peak_level >= SILENCE_GATE_LEVEL_DBFS)
+    )
+    if not active.any():
+        return np.ones(len(chunks), dtype=bool)
+    return active
+
+def analyze_audio(audio_path, lat=-1, lon=-1, week=-1, overlap=0.0, sensitivity=1.0, workers=None, audio_hash=None, stats=None):
+    """
+    Run BirdNET over every 3 s window and return the per-window prediction
+    lists of (class index, score). Windows rejected by the silence gate get
+    an empty list; when a stats dict is passed it receives the window and
+    skip counts.
+    """
+    audio_chunks = read_audio_data(audio_path, overlap, audio_hash=audio_hash)
+    week = max(1, min(week, 48)) if week != -1 else 24
+    mdata = convert_metadata(np.array([lat, lon, week]))
+    mdata = np.expand_dims(mdata, 0)
+    species_mask = species_filter(lat, lon, week)
+
+    if SILENCE_GATE_ENABLED:
+        active = np.flatnonzero(silence_gate(audio_chunks))
+    else:
+        active = np.arange(len(audio_chunks))
+    active_chunks = [audio_chunks[i] for i in active]
+    skipped = len(audio_chunks) - len(active_chunks)
+    if stats is not None:
+        stats.update({'windows': len(audio_chunks), 'skipped_windows': skipped, 'invocations': len(active_chunks)})
+    logger.debug("BirdNET silence gate skipped %d of %d windows for %s", skipped, len(audio_chunks), audio_path)
+
+    workers = SHARD_WORKERS if workers is None else workers
+    duration = len(active_chunks) * (3.0 - overlap)
+    if not active_chunks:
+        active_preds = []
+    elif workers > 1 and len(active_chunks) > 1 and duration >= SHARD_MIN_SECONDS:
+        active_preds = predict_sharded(active_chunks, mdata, sensitivity, species_mask, min(workers, len(active_chunks)))
+    else:
+        with get_interpreter_pool().checkout() as model:
+            active_preds = predict_chunks(active_chunks, model, mdata, sensitivity, species_mask)
+
+    chunk_preds = [[] for _ in audio_chunks]
+    for i, preds in zip(active, active_preds):
+        chunk_preds[i] = preds
+    return chunk_preds
 
 def run_birdnet_inference(
     audio_path,
@@ -91,17 +664,172 @@ def run_birdnet_inference(
     week=-1,
     overlap=0.0,
     sensitivity=1.0,
-    top_n=3
+    top_n=3,
+    workers=None,
+    stats=None
 ):
-    interpreter, input_layer_index, mdata_input_index, output_layer_index, classes = load_birdnet_model()
-    audio_chunks = read_audio_data(audio_path, overlap)
-    week = max(1, min(week, 48)) if week != -1 else 24
-    mdata = convert_metadata(np.array([lat, lon, week]))
-    mdata = np.expand_dims(mdata, 0)
-    all_preds = []
-    for c in audio_chunks:
-        sig = np.expand_dims(c, 0)
-        preds = predict([sig, mdata], interpreter, input_layer_index, mdata_input_index, output_layer_index, classes, sensitivity)
-        all_preds.extend(preds)
+    classes = load_birdnet_labels()
+    chunk_preds = analyze_audio(audio_path, lat, lon, week, overlap, sensitivity, workers, stats=stats)
+    all_preds = [(classes[i], score) for preds in chunk_preds for i, score in preds]
     all_preds.sort(key=lambda x: x[1], reverse=True)
-    return all_preds[:top_n]
\ No newline at end of file
+    return all_preds[:top_n]
+
+def model_version():
+    """Fingerprint of the model and label files, part of every result cache key"""
+    if 'model_version' not in _birdnet_cache:
+        digest = hashlib.sha256(b'stub' if STUB_INTERPRETER else b'')
+        for path in (BIRDNET_MODEL_PATH, BIRDNET_LABELS_PATH, BIRDNET_LABEL_TABLE_PATH, BIRDNET_MDATA_MODEL_PATH):
+            if os.path.exists(path):
+                digest.update(file_hash(path).encode())
+        _birdnet_cache['model_version'] = digest.hexdigest()[:16]
+    return _birdnet_cache['model_version']
+
+class ResultCache:
+    """
+    Identification results keyed by audio content hash and inference
+    parameters. A bounded in-memory LRU sits in front of an optional
+    directory of JSON files shared between processes.
+    """
+
+    def __init__(self, size=RESULT_CACHE_SIZE, directory=RESULT_CACHE_DIR):
+        self.size = size
+        self.directory = directory
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(audio_hash, **params):
+        params['model_version'] = model_version()
+        # Settings that change which windows and species survive, so entries don't outlive them
+        params['silence_gate'] = SILENCE_GATE_ENABLED and [
+            *SILENCE_GATE_BAND, SILENCE_GATE_RATIO, SILENCE_GATE_LEVEL_DBFS, SILENCE_GATE_MIN_WINDOWS
+        ]
+        params['location_filter_threshold'] = LOCATION_FILTER_THRESHOLD
+        encoded = json.dumps(params, sort_keys=True)
+        return hashlib.sha256(f"{audio_hash}:{encoded}".encode()).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(self._entries[key])
+        value = None
+        if self.directory:
+            try:
+                with open(os.path.join(self.directory, f"{key}.json")) as f:
+                    value = json.load(f)
+            except (FileNotFoundError, ValueError):
+                value = None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, value)
+        return copy.deepcopy(value)
+
+    def put(self, key, value):
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._remember(key, value)
+        if self.directory:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(value, f)
+            os.replace(tmp_path, os.path.join(self.directory, f"{key}.json"))
+
+    def _remember(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def metrics(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+def get_result_cache():
+    if 'result_cache' not in _birdnet_cache:
+        _birdnet_cache['result_cache'] = ResultCache()
+    return _birdnet_cache['result_cache']
+
+def identify_species(
+    audio_path,
+    lat=-1,
+    lon=-1,
+    week=-1,
+    overlap=0.0,
+    sensitivity=1.0,
+    top_k=5,
+    min_confidence=0.1,
+    workers=None,
+    stats=None
+):
+    """
+    Top-k species heard in a recording, each with the time segments
+    (in seconds) where it was detected above min_confidence.
+
+    Results are cached by audio content and parameters. So that requests from
+    the same area share entries, coordinates are snapped to the centre of
+    their location grid cell before inference.
+    """
+    if lat != -1 and lon != -1:
+        lat_cell, lon_cell = location_cell(lat, lon)
+        lat = (lat_cell + 0.5) * LOCATION_GRID_DEGREES
+        lon = (lon_cell + 0.5) * LOCATION_GRID_DEGREES
+    week = max(1, min(week, 48)) if week != -1 else 24
+
+    cache = get_result_cache() if RESULT_CACHE_SIZE > 0 else None
+    # The hash only keys the caches; skip reading the file twice when both are off
+    audio_hash = file_hash(audio_path) if cache is not None or AUDIO_CACHE_SIZE > 0 else None
+    if cache is not None:
+        key = ResultCache.make_key(
+            audio_hash, lat=lat, lon=lon, week=week, overlap=overlap,
+            sensitivity=sensitivity, top_k=top_k, min_confidence=min_confidence
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            if stats is not None:
+                stats['cached'] = True
+            return cached
+
+    chunk_preds = analyze_audio(audio_path, lat, lon, week, overlap, sensitivity, workers, audio_hash, stats)
+    step = 3.0 - overlap
+    species = {}
+    for i, preds in enumerate(chunk_preds):
+        for class_index, score in preds:
+            score = float(score)
+            if score < min_confidence:
+                continue
+            if class_index not in species:
+                info = species_info(class_index)
+                species[class_index] = {
+                    'scientific_name': info['scientific_name'],
+                    'common_name': info['common_name'],
+                    'bird_id': info['bird_id'],
+                    'confidence': 0.0,
+                    'segments': [],
+                }
+            entry = species[class_index]
+            entry['confidence'] = max(entry['confidence'], score)
+            entry['segments'].append({
+                'start_time': round(i * step, 2),
+                'end_time': round(i * step + 3.0, 2),
+                'confidence': score,
+            })
+    ranked = sorted(species.values(), key=lambda s: s['confidence'], reverse=True)[:top_k]
+    if cache is not None:
+        cache.put(key, ranked)
+    return ranked
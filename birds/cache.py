@@ -0,0 +1,116 @@
+"""
+Rendered-response cache for bird details.
+
+Each bird has a version stamp in the cache; the rendered JSON body is stored
+under the bird id and the current stamp, so bumping the stamp (see
+birds/signals.py) invalidates every cached copy at once without having to
+find them. Stamps are time-based rather than counters, so a stamp evicted
+from the cache can never come back with a value an old entry was stored
+under.
+
+On a miss only one request renders a given version: the others wait briefly
+for it to appear (cache.add() is the lock) instead of all hitting the
+database at once. Hits, misses and waits are counted in the cache; see
+stats() and the bird_detail_cache_stats command.
+
+A catalog-wide stamp is bumped along with any bird's, for responses that
+embed many birds (the ETag of the bird list, see core/conditional.py).
+
+Updates that bypass model signals (QuerySet.update(), bulk_create()) must
+call bump() themselves.
+
+All of this needs a cache every worker shares (Redis, see CACHES in
+core/settings.py). With a per-process cache a bump only reaches the process
+that saved the bird, so the others would serve the old body and ETag until
+it expired; shared() is False there and views render and validate without
+the stamps.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+VERSION_KEY = 'birds:detail:version:{}'
+CATALOG_KEY = 'birds:catalog:version'
+DETAIL_KEY = 'birds:detail:{}:{}'
+LOCK_KEY = 'birds:detail:lock:{}:{}'
+STATS_KEY = 'birds:detail:stats:{}'
+STATS = ('hits', 'misses', 'waits')
+WAIT_INTERVAL = 0.05
+
+def shared():
+    """Whether every worker sees the same stamps and bodies"""
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+def cacheable(request):
+    """Only plain JSON requests share a cached body; ?fields=, ?format= and friends render normally"""
+    return shared() and not request.query_params and request.accepted_media_type == 'application/json'
+
+def _stamp(key):
+    stamp = cache.get(key)
+    if stamp is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        stamp = cache.get(key)
+    return stamp
+
+def version(bird_id):
+    return _stamp(VERSION_KEY.format(bird_id))
+
+def catalog_version():
+    return _stamp(CATALOG_KEY)
+
+def bump(bird_ids):
+    """Give these birds (and the catalog) a new version stamp, invalidating their cached details"""
+    stamp = time.time_ns()
+    stamps = {VERSION_KEY.format(bird_id): stamp for bird_id in set(bird_ids)}
+    stamps[CATALOG_KEY] = stamp
+    cache.set_many(stamps, timeout=None)
+
+def _count(name):
+    key = STATS_KEY.format(name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+def get_or_render(bird_id, render):
+    """(body, hit) for a bird's detail, calling render() to build the body on a miss"""
+    stamp = version(bird_id)
+    key = DETAIL_KEY.format(bird_id, stamp)
+    body = cache.get(key)
+    if body is not None:
+        _count('hits')
+        return body, True
+
+    _count('misses')
+    lock = LOCK_KEY.format(bird_id, stamp)
+    if not cache.add(lock, 1, timeout=settings.BIRD_DETAIL_CACHE_LOCK_TIMEOUT):
+        # Another request is rendering this version; wait for its result
+        deadline = time.monotonic() + settings.BIRD_DETAIL_CACHE_LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(WAIT_INTERVAL)
+            body = cache.get(key)
+            if body is not None:
+                _count('waits')
+                return body, True
+        return render(), False
+
+    try:
+        body = render()
+        cache.set(key, body, timeout=settings.BIRD_DETAIL_CACHE_TIMEOUT)
+    finally:
+        cache.delete(lock)
+    return body, False
+
+def stats():
+    counts = cache.get_many([STATS_KEY.format(name) for name in STATS])
+    result = {name: counts.get(STATS_KEY.format(name), 0) for name in STATS}
+    served = result['hits'] + result['misses']
+    result['hit_rate'] = (result['hits'] + result['waits']) / served if served else 0.0
+    return result
+
+def reset_stats():
+    cache.delete_many([STATS_KEY.format(name) for name in STATS])
@@ -0,0 +1,144 @@
+"""
+Peak-pair audio fingerprints for "sounds like" matching against BirdSound.
+
+Each recording is reduced to the local maxima of its log spectrogram; nearby
+peaks are paired into (f1, f2, dt) hashes stored with the anchor's frame
+offset in SoundFingerprint. A query clip is hashed the same way, candidate
+rows are fetched through the hash index, and each reference sound is scored
+by the largest number of hashes agreeing on a single time offset.
+"""
+import os
+import time
+from collections import Counter, defaultdict
+
+import numpy as np
+from django.db import transaction
+from scipy.ndimage import maximum_filter
+
+from .birdnet_helper import decode_audio
+from .models import BirdSound, SoundFingerprint
+from .sonogram import STFT_BLOCK_FRAMES, download_sound
+
+FINGERPRINT_SAMPLE_RATE = 22050
+FINGERPRINT_N_FFT = 1024
+FINGERPRINT_HOP = 256
+FINGERPRINT_MIN_BIN = 40  # ~860 Hz, below which wind and traffic dominate
+FINGERPRINT_MAX_BIN = 511
+PEAK_NEIGHBOURHOOD = (9, 5)  # (frequency bins, frames)
+FREQUENCY_QUANTUM = 2  # hash bins are ~43 Hz wide so sweeps survive small time shifts
+PEAK_THRESHOLD = 2.0  # log-magnitude above the median, i.e. ~17 dB
+PEAKS_PER_SECOND = 30
+FAN_OUT = 10
+MAX_DT = 63
+QUERY_SHIFTS = 4  # sub-hop alignments tried for a query clip
+LOOKUP_BATCH = 500
+
+def spectrogram(sig):
+    """Log-magnitude STFT (time x freq) limited to the fingerprint band"""
+    if len(sig) < FINGERPRINT_N_FFT:
+        sig = np.pad(sig, (0, FINGERPRINT_N_FFT - len(sig)))
+    frames = np.lib.stride_tricks.sliding_window_view(sig, FINGERPRINT_N_FFT)[::FINGERPRINT_HOP]
+    window = np.hanning(FINGERPRINT_N_FFT).astype('float32')
+    # Blocked so long reference recordings don't materialise the full complex STFT
+    blocks = []
+    for start in range(0, len(frames), STFT_BLOCK_FRAMES):
+        mag = np.abs(np.fft.rfft(frames[start:start + STFT_BLOCK_FRAMES] * window, axis=1))
+        blocks.append(np.log(mag[:, FINGERPRINT_MIN_BIN:FINGERPRINT_MAX_BIN + 1] + 1e-6).astype('float32'))
+    return np.concatenate(blocks)
+
+def find_peaks(spec):
+    """(frame, bin) of the strongest local maxima, capped at PEAKS_PER_SECOND"""
+    local_max = maximum_filter(spec, size=PEAK_NEIGHBOURHOOD[::-1], mode='constant', cval=-np.inf) == spec
+    local_max &= spec > np.median(spec) + PEAK_THRESHOLD
+    frames, bins = np.nonzero(local_max)
+
+    limit = int(PEAKS_PER_SECOND * len(spec) * FINGERPRINT_HOP / FINGERPRINT_SAMPLE_RATE) + 1
+    if len(frames) > limit:
+        keep = np.argsort(spec[frames, bins])[-limit:]
+        frames, bins = frames[keep], bins[keep]
+    order = np.lexsort((bins, frames))
+    return frames[order], bins[order]
+
+def hash_peaks(frames, bins):
+    """Pair each anchor peak with the next FAN_OUT peaks into 22-bit (f1, f2, dt) hashes"""
+    bins = bins // FREQUENCY_QUANTUM
+    hashes, offsets = [], []
+    for k in range(1, FAN_OUT + 1):
+        dt = frames[k:] - frames[:-k]
+        valid = (dt > 0) & (dt <= MAX_DT)
+        hashes.append((bins[:-k][valid] << 14) | (bins[k:][valid] << 6) | dt[valid])
+        offsets.append(frames[:-k][valid])
+    if not hashes:
+        return np.zeros(0, dtype='int64'), np.zeros(0, dtype='int64')
+    return np.concatenate(hashes).astype('int64'), np.concatenate(offsets).astype('int64')
+
+def fingerprint_signal(sig):
+    """(hashes, offsets) for a mono signal at FINGERPRINT_SAMPLE_RATE"""
+    return hash_peaks(*find_peaks(spectrogram(sig)))
+
+def fingerprint_file(path):
+    """(hashes, offsets) for an audio file"""
+    return fingerprint_signal(decode_audio(path, FINGERPRINT_SAMPLE_RATE))
+
+def index_sound(sound):
+    """Replace the stored fingerprints of a BirdSound, returning the number of hashes"""
+    temp_sound_path = download_sound(sound.sound_url)
+    try:
+        hashes, offsets = fingerprint_file(temp_sound_path)
+    finally:
+        os.remove(temp_sound_path)
+
+    with transaction.atomic():
+        SoundFingerprint.objects.filter(sound=sound).delete()
+        SoundFingerprint.objects.bulk_create(
+            [SoundFingerprint(sound=sound, hash=h, offset=o) for h, o in zip(hashes.tolist(), offsets.tolist())],
+            batch_size=5000
+        )
+    return len(hashes)
+
+def match_file(path, top=5, min_score=5):
+    """
+    Closest reference sounds for a clip. 'matches' holds
+    {'sound': BirdSound, 'score': int, 'offset': seconds} best first, where
+    offset is where the clip starts within the reference recording.
+    """
+    sig = decode_audio(path, FINGERPRINT_SAMPLE_RATE)
+    # A clip rarely starts on the reference's frame grid; hashing it at a few
+    # sub-hop shifts keeps peaks on fast frequency sweeps comparable
+    query_offsets = defaultdict(set)
+    for shift in range(0, FINGERPRINT_HOP, FINGERPRINT_HOP // QUERY_SHIFTS):
+        hashes, offsets = fingerprint_signal(sig[shift:])
+        for h, o in zip(hashes.tolist(), offsets.tolist()):
+            query_offsets[h].add(o)
+
+    started = time.monotonic()
+
+    votes = Counter()
+    keys = list(query_offsets)
+    for start in range(0, len(keys), LOOKUP_BATCH):
+        rows = SoundFingerprint.objects.filter(
+            hash__in=keys[start:start + LOOKUP_BATCH]
+        ).values_list('hash', 'sound_id', 'offset')
+        for h, sound_id, offset in rows:
+            for query_offset in query_offsets[h]:
+                votes[sound_id, offset - query_offset] += 1
+
+    best = {}
+    for (sound_id, delta), count in votes.items():
+        if count >= min_score and count > best.get(sound_id, (0, 0))[0]:
+            best[sound_id] = (count, delta)
+    ranked = sorted(best.items(), key=lambda item: item[1][0], reverse=True)[:top]
+
+    sounds = BirdSound.objects.select_related('bird').in_bulk([sound_id for sound_id, _ in ranked])
+    return {
+        'query_hashes': len(query_offsets),
+        'lookup_ms': round((time.monotonic() - started) * 1000, 1),
+        'matches': [
+            {
+                'sound': sounds[sound_id],
+                'score': count,
+                'offset': round(delta * FINGERPRINT_HOP / FINGERPRINT_SAMPLE_RATE, 2),
+            }
+            for sound_id, (count, delta) in ranked if sound_id in sounds
+        ],
+    }
@@ -0,0 +1,245 @@
+"""
+Helpers for the offline ingestion commands (ingest_audio_survey, ingest_camera_trap).
+
+Kept free of Django imports: the worker functions here run in spawned
+processes that never set Django up, and only return plain data for the
+command to write to the database.
+"""
+import datetime
+import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+import numpy as np
+
+AUDIO_EXTENSIONS = ('.wav', '.flac', '.mp3', '.ogg')
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+BIRD_IMAGE_MODEL = "dennisjooo/Birds-Classifier-EfficientNetB2"
+THUMBNAIL_SIZE = (64, 48)
+# Recording units (AudioMoth, SM4, ...) name files <prefix>_YYYYMMDD_HHMMSS.wav
+RECORDING_TIMESTAMP = re.compile(r'(\d{8})[_-]?(\d{6})')
+
+class Checkpoint:
+    """
+    Append-only list of completed files, one relative path per line. Files
+    are only marked once their results are committed, so an interrupted run
+    redoes at most the last uncommitted batch.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.completed = set()
+        if os.path.exists(path):
+            with open(path) as f:
+                self.completed = {line.rstrip('\n') for line in f if line.strip()}
+        self._file = open(path, 'a')
+
+    def __contains__(self, name):
+        return name in self.completed
+
+    def __len__(self):
+        return len(self.completed)
+
+    def mark(self, names):
+        for name in names:
+            self._file.write(name + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.completed.update(names)
+
+    def close(self):
+        self._file.close()
+
+def iter_files(root, extensions):
+    """Relative paths of matching files under root, in a stable order"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith(extensions) and not name.startswith('.'):
+                yield os.path.relpath(os.path.join(dirpath, name), root)
+
+def bounded_map(executor, fn, items, max_in_flight):
+    """
+    Like executor.map but yields results as they complete and never has more
+    than max_in_flight tasks submitted, so memory stays flat however many
+    items there are.
+    """
+    items = iter(items)
+    in_flight = set()
+    while True:
+        for item in items:
+            in_flight.add(executor.submit(fn, item))
+            if len(in_flight) >= max_in_flight:
+                break
+        if not in_flight:
+            return
+        done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield future.result()
+
+class Progress:
+    """Periodic progress line with item and work throughput"""
+
+    def __init__(self, write, total, unit, work_unit=None, every=10.0):
+        self.write = write
+        self.total = total
+        self.unit = unit
+        self.work_unit = work_unit
+        self.every = every
+        self.done = 0
+        self.work = 0.0
+        self.started = time.monotonic()
+        self._last = self.started
+
+    def update(self, items=1, work=0.0):
+        self.done += items
+        self.work += work
+        now = time.monotonic()
+        if now - self._last >= self.every:
+            self._last = now
+            self.write(self.summary())
+
+    def summary(self):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        line = f"{self.done}/{self.total} {self.unit} ({self.done / elapsed:.1f} {self.unit}/s"
+        if self.work_unit:
+            line += f", {self.work / elapsed:.1f} {self.work_unit}"
+        if self.done:
+            remaining = (self.total - self.done) * elapsed / self.done
+            line += f", ~{remaining / 60:.0f} min left"
+        return line + ")"
+
+def recording_time(path):
+    """Recording start parsed from the file name, falling back to its mtime"""
+    match = RECORDING_TIMESTAMP.search(os.path.basename(path))
+    if match:
+        try:
+            return datetime.datetime.strptime(''.join(match.groups()), '%Y%m%d%H%M%S')
+        except ValueError:
+            pass
+    return datetime.datetime.fromtimestamp(os.path.getmtime(path))
+
+def init_audio_worker():
+    """
+    Each worker process holds a single interpreter and runs one file at a
+    time. Survey files are analysed once, so the decoded audio and result
+    caches would only fill the disk (an hour at 48 kHz decodes to ~690 MB)
+    and memory; they are turned off.
+    """
+    from . import birdnet_helper
+    birdnet_helper._birdnet_cache['pool'] = birdnet_helper.InterpreterPool(size=1, num_threads=1)
+    birdnet_helper.AUDIO_CACHE_SIZE = 0
+    birdnet_helper.RESULT_CACHE_SIZE = 0
+
+def analyze_survey_file(task):
+    """
+    BirdNET species for one survey recording. task is (root, relative path,
+    lat, lon, top_k, min_confidence); returns a plain dict either way.
+    """
+    from . import birdnet_helper
+
+    root, name, lat, lon, top_k, min_confidence = task
+    path = os.path.join(root, name)
+    try:
+        recorded_at = recording_time(path)
+        stats = {}
+        species = birdnet_helper.identify_species(
+            path,
+            lat=lat,
+            lon=lon,
+            week=birdnet_helper.week_of_year(recorded_at.date()),
+            top_k=top_k,
+            min_confidence=min_confidence,
+            workers=1,
+            stats=stats
+        )
+        return {
+            'name': name,
+            'path': path,
+            'duration': birdnet_helper.audio_duration(path),
+            'recorded_at': recorded_at.isoformat(),
+            'species': species,
+            'stats': stats,
+        }
+    except Exception as e:
+        return {'name': name, 'path': path, 'duration': 0.0, 'error': f"{type(e).__name__}: {e}"}
+
+_image_classifier = None
+
+def init_image_worker(model=BIRD_IMAGE_MODEL, threads=1):
+    """Load the classifier once per worker process"""
+    global _image_classifier
+    import torch
+    from transformers import pipeline
+
+    torch.set_num_threads(threads)
+    _image_classifier = pipeline("image-classification", model=model)
+
+def thumbnail(path):
+    """Small greyscale float array; JPEG draft mode decodes at reduced size, so this is cheap"""
+    from PIL import Image
+
+    with Image.open(path) as img:
+        img.draft('L', (THUMBNAIL_SIZE[0] * 4, THUMBNAIL_SIZE[1] * 4))
+        return np.asarray(img.convert('L').resize(THUMBNAIL_SIZE), dtype='float32')
+
+def image_time(path):
+    """EXIF DateTime of a photo, falling back to its mtime"""
+    from PIL import Image
+
+    with Image.open(path) as img:
+        taken = img.getexif().get(306)
+    if taken:
+        try:
+            return datetime.datetime.strptime(taken.strip(), '%Y:%m:%d %H:%M:%S')
+        except ValueError:
+            pass
+    return datetime.datetime.fromtimestamp(os.path.getmtime(path))
+
+def classify_image_batch(task):
+    """
+    Classify consecutive frames from one camera-trap folder in a single
+    forward pass. task is (root, names, previous name or None, min_std,
+    min_change). Frames that are nearly uniform (lens covered, night without
+    flash) or nearly identical to the frame before them are reported as
+    empty without reaching the classifier.
+    """
+    from PIL import Image
+
+    root, names, previous, min_std, min_change = task
+    results = []
+    try:
+        last = thumbnail(os.path.join(root, previous)) if previous else None
+    except Exception:
+        last = None
+
+    to_classify = []
+    for name in names:
+        path = os.path.join(root, name)
+        result = {'name': name, 'path': path}
+        try:
+            thumb = thumbnail(path)
+            result['taken_at'] = image_time(path).isoformat()
+            empty = thumb.std() < min_std or (
+                last is not None and np.abs(thumb - last).mean() < min_change
+            )
+            last = thumb
+            result['empty'] = bool(empty)
+            if not empty:
+                to_classify.append(result)
+        except Exception as e:
+            result['error'] = f"{type(e).__name__}: {e}"
+        results.append(result)
+
+    if to_classify:
+        try:
+            images = [Image.open(result['path']).convert('RGB') for result in to_classify]
+            predictions = _image_classifier(images, batch_size=len(images), top_k=1)
+            for result, prediction in zip(to_classify, predictions):
+                result['label'] = prediction[0]['label']
+                result['score'] = float(prediction[0]['score'])
+        except Exception as e:
+            for result in to_classify:
+                result['error'] = f"{type(e).__name__}: {e}"
+    return results
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from birds import cache as bird_cache
+from birds.models import Bird
+
+class Command(BaseCommand):
+    help = 'Shows hit-rate counters for the cached bird detail responses'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Zero the counters after printing them')
+        parser.add_argument('--invalidate', action='store_true', help='Invalidate every cached bird detail')
+
+    def handle(self, *args, **options):
+        stats = bird_cache.stats()
+        self.stdout.write(
+            f"hits={stats['hits']} misses={stats['misses']} waits={stats['waits']} "
+            f"hit_rate={stats['hit_rate']:.1%}"
+        )
+        if options['reset']:
+            bird_cache.reset_stats()
+            self.stdout.write(self.style.SUCCESS('Counters reset'))
+        if options['invalidate']:
+            bird_cache.bump(Bird.objects.values_list('pk', flat=True))
+            self.stdout.write(self.style.SUCCESS('Bird detail cache invalidated'))
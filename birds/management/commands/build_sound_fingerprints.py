@@ -0,0 +1,52 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from birds.fingerprint import index_sound
+from birds.models import BirdSound
+
+def _index(sound):
+    try:
+        return index_sound(sound)
+    finally:
+        close_old_connections()
+
+class Command(BaseCommand):
+    help = 'Computes peak-pair fingerprints for BirdSound reference recordings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help='Re-fingerprint sounds that already have fingerprints')
+        parser.add_argument('--sound', type=int, nargs='*', help='Only these BirdSound ids')
+        parser.add_argument('--workers', type=int, default=4, help='Sounds downloaded and fingerprinted in parallel')
+
+    def handle(self, *args, **options):
+        sounds = BirdSound.objects.all()
+        if options['sound']:
+            sounds = sounds.filter(pk__in=options['sound'])
+        if not options['rebuild']:
+            sounds = sounds.filter(fingerprints__isnull=True)
+        sounds = list(sounds.distinct())
+
+        started = time.monotonic()
+        total_hashes = 0
+        failed = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            futures = {executor.submit(_index, sound): sound for sound in sounds}
+            for done, future in enumerate(as_completed(futures), 1):
+                sound = futures[future]
+                try:
+                    total_hashes += future.result()
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"Sound {sound.pk} ({sound.sound_url}): {e}")
+                if done % 50 == 0:
+                    self.stdout.write(f"{done}/{len(sounds)} sounds fingerprinted")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Fingerprinted {len(sounds) - failed} sounds ({total_hashes} hashes, {failed} failed) "
+                f"in {time.monotonic() - started:.1f}s"
+            )
+        )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from birds.birdnet_helper import BIRDNET_LABEL_TABLE_PATH, BIRDNET_LABELS_PATH, compile_label_table
+from birds.models import Bird
+
+class Command(BaseCommand):
+    help = 'Compiles the BirdNET labels into a memory-mapped table linked to Bird records'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--labels', default=BIRDNET_LABELS_PATH, help='Path to labels.txt')
+        parser.add_argument('--output', default=BIRDNET_LABEL_TABLE_PATH, help='Where to write the compiled table')
+
+    def handle(self, *args, **options):
+        bird_ids = {
+            scientific_name.lower(): pk
+            for pk, scientific_name in Bird.objects.values_list('id', 'scientific_name')
+        }
+        table = compile_label_table(options['labels'], options['output'], bird_ids)
+        linked = int((table['bird_id'] >= 0).sum())
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Compiled {len(table)} labels ({linked} linked to birds) "
+                f"into {options['output']} ({table.nbytes} bytes)"
+            )
+        )
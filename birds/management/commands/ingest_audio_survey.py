@@ -0,0 +1,152 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from birds.ingest import (
+    AUDIO_EXTENSIONS, Checkpoint, Progress, analyze_survey_file, bounded_map, init_audio_worker, iter_files
+)
+from birds.models import Bird, BirdIdentification
+
+class Command(BaseCommand):
+    help = 'Runs BirdNET over a directory of survey recordings, resuming from a checkpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help='Root directory of the recordings')
+        parser.add_argument('--user', required=True, help='Email of the user the identifications belong to')
+        parser.add_argument('--lat', type=float, default=-1, help='Latitude of the recording unit')
+        parser.add_argument('--lon', type=float, default=-1, help='Longitude of the recording unit')
+        parser.add_argument('--location-name', default='', help='Location name stored on each identification')
+        parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) - 1), help='Worker processes')
+        parser.add_argument('--batch-size', type=int, default=200, help='Files committed per database transaction')
+        parser.add_argument('--top-k', type=int, default=settings.BIRDNET_TOP_K, help='Species kept per file')
+        parser.add_argument(
+            '--min-confidence', type=float, default=settings.BIRDNET_MIN_CONFIDENCE,
+            help='Minimum BirdNET confidence for a detection'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Checkpoint file (default: .ingest_audio_survey.checkpoint in the directory)'
+        )
+
+    def handle(self, *args, **options):
+        directory = os.path.abspath(options['directory'])
+        if not os.path.isdir(directory):
+            raise CommandError(f"{directory} is not a directory")
+        try:
+            self.user = get_user_model().objects.get(email=options['user'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user with email {options['user']}")
+        self.options = options
+        self.birds = {}
+
+        checkpoint = Checkpoint(options['checkpoint'] or os.path.join(directory, '.ingest_audio_survey.checkpoint'))
+        names = [name for name in iter_files(directory, AUDIO_EXTENSIONS) if name not in checkpoint]
+        self.stdout.write(f"{len(checkpoint)} files already ingested, {len(names)} to go")
+
+        tasks = (
+            (directory, name, options['lat'], options['lon'], options['top_k'], options['min_confidence'])
+            for name in names
+        )
+        progress = Progress(self.stdout.write, len(names), 'files', 'audio-min/min')
+        batch = []
+        failed = 0
+        saved = 0
+        # spawn rather than fork so each worker builds its own interpreter from scratch
+        with ProcessPoolExecutor(
+            max_workers=options['workers'],
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=init_audio_worker
+        ) as executor:
+            try:
+                # Failed files are not checkpointed, so they are retried on the next run
+                for result in bounded_map(executor, analyze_survey_file, tasks, options['workers'] * 2):
+                    if 'error' in result:
+                        failed += 1
+                        self.stderr.write(f"{result['name']}: {result['error']}")
+                    else:
+                        batch.append(result)
+                    progress.update(1, result['duration'])
+                    if len(batch) >= options['batch_size']:
+                        saved += self.save_batch(batch, checkpoint)
+            finally:
+                if batch:
+                    saved += self.save_batch(batch, checkpoint)
+                checkpoint.close()
+
+        self.stdout.write(progress.summary())
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Ingested {progress.done - failed} files ({saved} detections, {failed} failed) "
+                f"from {directory}"
+            )
+        )
+
+    def get_bird(self, species):
+        key = species['scientific_name']
+        if key not in self.birds:
+            bird = None
+            if species['bird_id'] is not None:
+                bird = Bird.objects.filter(pk=species['bird_id']).first()
+            if bird is None:
+                bird, created = Bird.objects.get_or_create(
+                    scientific_name=species['scientific_name'],
+                    defaults={
+                        'name': species['common_name'] or species['scientific_name'],
+                        'description': 'Automatically identified bird',
+                        'image_url': ''
+                    }
+                )
+            self.birds[key] = bird
+        return self.birds[key]
+
+    def save_batch(self, batch, checkpoint):
+        """
+        Bulk-insert one row per detected species, then checkpoint the files.
+        Files that already have rows are skipped, so a crash between the
+        commit and the checkpoint write doesn't duplicate them on resume.
+        """
+        with transaction.atomic():
+            stored = set(
+                BirdIdentification.objects.filter(
+                    user=self.user,
+                    sound_url__in=[Path(result['path']).as_uri() for result in batch]
+                ).values_list('sound_url', flat=True)
+            )
+            rows = self.build_rows(batch, stored)
+            BirdIdentification.objects.bulk_create(rows, batch_size=1000)
+        checkpoint.mark([result['name'] for result in batch])
+        batch.clear()
+        return len(rows)
+
+    def build_rows(self, batch, stored):
+        rows = []
+        for result in batch:
+            sound_url = Path(result['path']).as_uri()
+            if sound_url in stored:
+                continue
+            for species in result['species']:
+                rows.append(BirdIdentification(
+                    user=self.user,
+                    bird=self.get_bird(species),
+                    sound_url=sound_url,
+                    identified_species=species['scientific_name'],
+                    confidence_level=species['confidence'] * 100,
+                    ai_response={
+                        'engine': 'birdnet',
+                        'source': 'ingest_audio_survey',
+                        'file': result['name'],
+                        'recorded_at': result['recorded_at'],
+                        'duration': result['duration'],
+                        'species': species,
+                    },
+                    latitude=self.options['lat'] if self.options['lat'] != -1 else None,
+                    longitude=self.options['lon'] if self.options['lon'] != -1 else None,
+                    location_name=self.options['location_name']
+                ))
+        return rows
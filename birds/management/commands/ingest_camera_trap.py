@@ -0,0 +1,167 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from birds.ingest import (
+    BIRD_IMAGE_MODEL, IMAGE_EXTENSIONS, Checkpoint, Progress, bounded_map, classify_image_batch,
+    init_image_worker, iter_files
+)
+from birds.models import Bird, BirdIdentification
+
+class Command(BaseCommand):
+    help = 'Classifies a camera-trap image folder, skipping empty frames and resuming from a checkpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help='Root directory of the deployment images')
+        parser.add_argument('--user', required=True, help='Email of the user the identifications belong to')
+        parser.add_argument('--lat', type=float, required=True, help='Latitude of the deployment')
+        parser.add_argument('--lon', type=float, required=True, help='Longitude of the deployment')
+        parser.add_argument('--deployment', default='', help='Deployment name stored as the location name')
+        parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 2) // 2), help='Worker processes')
+        parser.add_argument('--threads', type=int, default=2, help='Torch threads per worker')
+        parser.add_argument('--batch-size', type=int, default=16, help='Images per forward pass')
+        parser.add_argument('--min-confidence', type=float, default=0.5, help='Minimum classifier score to keep')
+        parser.add_argument('--min-std', type=float, default=4.0, help='Frames with less grey-level spread are empty')
+        parser.add_argument(
+            '--min-change', type=float, default=2.0,
+            help='Frames differing from the previous one by less than this mean grey level are empty'
+        )
+        parser.add_argument('--commit-every', type=int, default=500, help='Images committed per database transaction')
+        parser.add_argument('--model', default=BIRD_IMAGE_MODEL, help='HuggingFace image-classification model')
+        parser.add_argument(
+            '--checkpoint',
+            help='Checkpoint file (default: .ingest_camera_trap.checkpoint in the directory)'
+        )
+
+    def handle(self, *args, **options):
+        directory = os.path.abspath(options['directory'])
+        if not os.path.isdir(directory):
+            raise CommandError(f"{directory} is not a directory")
+        try:
+            self.user = get_user_model().objects.get(email=options['user'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user with email {options['user']}")
+        self.options = options
+        self.birds = {}
+
+        checkpoint = Checkpoint(options['checkpoint'] or os.path.join(directory, '.ingest_camera_trap.checkpoint'))
+        names = list(iter_files(directory, IMAGE_EXTENSIONS))
+        todo = sum(1 for name in names if name not in checkpoint)
+        self.stdout.write(f"{len(checkpoint)} images already ingested, {todo} to go")
+
+        progress = Progress(self.stdout.write, todo, 'images')
+        pending = []
+        counts = {'birds': 0, 'empty': 0, 'low_confidence': 0, 'failed': 0}
+        with ProcessPoolExecutor(
+            max_workers=options['workers'],
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=init_image_worker,
+            initargs=(options['model'], options['threads'])
+        ) as executor:
+            try:
+                tasks = self.batches(directory, names, checkpoint)
+                for results in bounded_map(executor, classify_image_batch, tasks, options['workers'] * 2):
+                    for result in results:
+                        if 'error' in result:
+                            # Not checkpointed, so retried on the next run
+                            counts['failed'] += 1
+                            self.stderr.write(f"{result['name']}: {result['error']}")
+                            continue
+                        pending.append(result)
+                    progress.update(len(results))
+                    if len(pending) >= options['commit_every']:
+                        self.save_batch(pending, checkpoint, counts)
+            finally:
+                if pending:
+                    self.save_batch(pending, checkpoint, counts)
+                checkpoint.close()
+
+        self.stdout.write(progress.summary())
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Processed {progress.done} images from {directory}: {counts['birds']} identifications, "
+                f"{counts['empty']} empty, {counts['low_confidence']} below confidence, {counts['failed']} failed"
+            )
+        )
+
+    def batches(self, directory, names, checkpoint):
+        """Consecutive frames of one folder per batch, with the frame before them for the change filter"""
+        for folder, group in groupby(names, key=os.path.dirname):
+            previous = None
+            batch = []
+            for name in group:
+                if name in checkpoint:
+                    previous = name
+                    continue
+                batch.append(name)
+                if len(batch) == self.options['batch_size']:
+                    yield (directory, batch, previous, self.options['min_std'], self.options['min_change'])
+                    previous = batch[-1]
+                    batch = []
+            if batch:
+                yield (directory, batch, previous, self.options['min_std'], self.options['min_change'])
+
+    def get_bird(self, label):
+        if label not in self.birds:
+            self.birds[label], created = Bird.objects.get_or_create(
+                scientific_name=label,
+                defaults={
+                    'name': label,
+                    'description': 'Automatically identified bird',
+                    'image_url': ''
+                }
+            )
+        return self.birds[label]
+
+    def save_batch(self, results, checkpoint, counts):
+        """
+        Bulk-insert identifications for the frames with a confident bird, then
+        checkpoint them all. Frames that already have a row are skipped, so a
+        crash between the commit and the checkpoint write doesn't duplicate
+        them on resume.
+        """
+        rows = []
+        for result in results:
+            if result['empty']:
+                counts['empty'] += 1
+                continue
+            if result['score'] < self.options['min_confidence']:
+                counts['low_confidence'] += 1
+                continue
+            rows.append(BirdIdentification(
+                user=self.user,
+                bird=self.get_bird(result['label']),
+                image_url=Path(result['path']).as_uri(),
+                identified_species=result['label'],
+                confidence_level=result['score'] * 100,
+                ai_response={
+                    'engine': 'image-classifier',
+                    'model': self.options['model'],
+                    'source': 'ingest_camera_trap',
+                    'file': result['name'],
+                    'taken_at': result['taken_at'],
+                    'label': result['label'],
+                    'score': result['score'],
+                },
+                latitude=self.options['lat'],
+                longitude=self.options['lon'],
+                location_name=self.options['deployment']
+            ))
+        with transaction.atomic():
+            stored = set(
+                BirdIdentification.objects.filter(
+                    user=self.user,
+                    image_url__in=[row.image_url for row in rows]
+                ).values_list('image_url', flat=True)
+            )
+            rows = [row for row in rows if row.image_url not in stored]
+            BirdIdentification.objects.bulk_create(rows, batch_size=1000)
+        checkpoint.mark([result['name'] for result in results])
+        counts['birds'] += len(rows)
+        results.clear()
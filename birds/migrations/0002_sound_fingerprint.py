@@ -0,0 +1,26 @@
+# Generated by Django 4.2.9 on 2026-10-18 23:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('birds', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SoundFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hash', models.IntegerField()),
+                ('offset', models.IntegerField()),
+                ('sound', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='fingerprints', to='birds.birdsound')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hash', 'sound', 'offset'], name='birds_fingerprint_hash_idx')],
+            },
+        ),
+    ]
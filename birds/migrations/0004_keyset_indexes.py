@@ -0,0 +1,17 @@
+# Generated by Django 4.2.9 on 2026-10-18 23:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('birds', '0003_birdcategory_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='birdidentification',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='birds_ident_user_created_idx'),
+        ),
+    ]
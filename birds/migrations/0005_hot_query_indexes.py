@@ -0,0 +1,17 @@
+# Generated by Django 4.2.9 on 2026-10-18 23:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('birds', '0004_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bird',
+            index=models.Index(fields=['rarity', 'name'], name='birds_bird_rarity_name_idx'),
+        ),
+    ]
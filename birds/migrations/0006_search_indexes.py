@@ -0,0 +1,44 @@
+# Trigram and full-text indexes for birds/search.py. They only exist on
+# PostgreSQL; other databases use the in-process search backend.
+
+from django.db import migrations
+
+TRIGRAM_FIELDS = ['name', 'scientific_name']
+
+
+def indexes():
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    return [
+        *[GinIndex(fields=[field], opclasses=['gin_trgm_ops'], name=f'birds_bird_{field}_trgm') for field in TRIGRAM_FIELDS],
+        GinIndex(SearchVector('global_distribution', config='simple'), name='birds_bird_distribution_fts'),
+    ]
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    Bird = apps.get_model('birds', 'Bird')
+    for index in indexes():
+        schema_editor.add_index(Bird, index)
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Bird = apps.get_model('birds', 'Bird')
+    for index in indexes():
+        schema_editor.remove_index(Bird, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('birds', '0005_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -55,6 +55,12 @@ class Bird(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Rarity filters, listed by name
+            models.Index(fields=['rarity', 'name'], name='birds_bird_rarity_name_idx'),
+        ]
+
     def __str__(self):
         return f"{self.name} ({self.scientific_name})"
 
@@ -78,6 +84,19 @@ class BirdSound(models.Model):
     class Meta:
         app_label = 'birds'
 
+class SoundFingerprint(models.Model):
+    """Spectral peak-pair hash of a reference BirdSound (see birds/fingerprint.py)"""
+    sound = models.ForeignKey(BirdSound, related_name='fingerprints', on_delete=models.CASCADE)
+    hash = models.IntegerField()
+    offset = models.IntegerField()  # anchor peak position in STFT frames
+
+    class Meta:
+        app_label = 'birds'
+        indexes = [
+            # Covers the whole lookup so matching never touches the table
+            models.Index(fields=['hash', 'sound', 'offset'], name='birds_fingerprint_hash_idx'),
+        ]
+
 class BirdIdentification(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='identifications', on_delete=models.CASCADE)
     bird = models.ForeignKey(Bird, related_name='identifications', on_delete=models.SET_NULL, null=True)
@@ -103,6 +122,10 @@ class BirdIdentification(models.Model):
     class Meta:
         app_label = 'birds'
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination of a user's identifications (core/pagination.py)
+            models.Index(fields=['user', 'created_at', 'id'], name='birds_ident_user_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.identified_species} - {self.confidence_level}% confidence"
@@ -150,6 +173,7 @@ class BirdCategory(models.Model):
     description = models.TextField()
     image_url = models.URLField(max_length=500)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         app_label = 'birds'
@@ -0,0 +1,174 @@
+"""
+Relevance-ranked, typo-tolerant search over the bird catalog.
+
+    from birds import search
+    birds = search.search(Bird.objects.all(), 'nothern cardnal', search.BIRD_FIELDS)
+    birds = search.search_text(birds, 'global_distribution', 'europe')
+
+search() keeps the rows where one of the fields contains the query or
+matches it closely word by word (trigram word similarity, so 'cardnal'
+finds 'Northern Cardinal'), annotates them with search_rank between 0 and 1
+and orders them best first. search_text() matches words in long text such
+as a bird's distribution. An empty query returns the queryset unchanged.
+
+The backend follows the database (or settings.BIRD_SEARCH_BACKEND, a dotted
+path):
+
+    PostgresSearchBackend  pg_trgm's %> and ILIKE over GIN trigram indexes,
+                           ranked by word_similarity(), and a GIN tsvector
+                           index for text search (birds migration 0006)
+    PythonSearchBackend    scores the candidate rows in process with the
+                           same trigram measure, for SQLite and tests; keeps
+                           the best settings.BIRD_SEARCH_MAX_RESULTS matches
+
+A word matches when its similarity reaches settings.BIRD_SEARCH_THRESHOLD
+(pg_trgm.word_similarity_threshold on Postgres, set on every connection).
+"""
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.utils.module_loading import import_string
+
+BIRD_FIELDS = ('name', 'scientific_name')
+
+WORD = re.compile(r'[^\W_]+')
+
+def search(queryset, query, fields):
+    query = query.strip()
+    if not query:
+        return queryset
+    return get_backend().search(queryset, query, fields)
+
+def search_text(queryset, field, value):
+    value = value.strip()
+    if not value:
+        return queryset
+    return get_backend().search_text(queryset, field, value)
+
+def get_backend():
+    if settings.BIRD_SEARCH_BACKEND:
+        return import_string(settings.BIRD_SEARCH_BACKEND)()
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend()
+    return PythonSearchBackend()
+
+def configure_connection(sender, connection, **kwargs):
+    """connection_created receiver: the threshold pg_trgm's %> operator matches at"""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT set_config('pg_trgm.word_similarity_threshold', %s, false)",
+                [str(settings.BIRD_SEARCH_THRESHOLD)]
+            )
+
+class PostgresSearchBackend:
+    def search(self, queryset, query, fields):
+        from django.contrib.postgres.lookups import TrigramWordSimilar
+        from django.contrib.postgres.search import TrigramWordSimilarity
+        from django.db.models.functions import Greatest
+
+        matches = Q()
+        for field in fields:
+            matches |= Q(**{f'{field}__icontains': query}) | Q(TrigramWordSimilar(F(field), Value(query)))
+        ranks = [TrigramWordSimilarity(query, field) for field in fields]
+        rank = Greatest(*ranks) if len(ranks) > 1 else ranks[0]
+        return queryset.filter(matches).annotate(search_rank=rank).order_by('-search_rank', 'pk')
+
+    def search_text(self, queryset, field, value):
+        from django.contrib.postgres.search import SearchQuery, SearchVector
+
+        # Same expression as the tsvector index, so the index is used
+        return queryset.alias(
+            text_match=SearchVector(field, config='simple')
+        ).filter(text_match=SearchQuery(value, config='simple'))
+
+class PythonSearchBackend:
+    def search(self, queryset, query, fields):
+        pattern = query.lower()
+        scored = []
+        for pk, *values in queryset.values_list('pk', *fields):
+            best = 0.0
+            contains = False
+            for value in values:
+                if value:
+                    best = max(best, word_similarity(query, value))
+                    contains = contains or pattern in value.lower()
+            if contains or best >= settings.BIRD_SEARCH_THRESHOLD:
+                scored.append((-best, pk))
+        scored.sort()
+        scored = scored[:settings.BIRD_SEARCH_MAX_RESULTS]
+        if not scored:
+            return queryset.none()
+        # One When per distinct score; names share words, so scores repeat a lot
+        by_score = {}
+        for score, pk in scored:
+            by_score.setdefault(-score, []).append(pk)
+        rank = Case(*[When(pk__in=pks, then=Value(score)) for score, pks in by_score.items()], output_field=FloatField())
+        return queryset.filter(pk__in=[pk for _, pk in scored]).annotate(search_rank=rank).order_by('-search_rank', 'pk')
+
+    def search_text(self, queryset, field, value):
+        return queryset.filter(**{f'{field}__icontains': value})
+
+@lru_cache(maxsize=65536)
+def word_trigrams(word):
+    """pg_trgm's trigrams of one lowercased word, in order: two spaces before it, one after"""
+    padded = f'  {word} '
+    trigrams = []
+    for i in range(len(padded) - 2):
+        trigram = padded[i:i + 3]
+        if trigram not in trigrams:
+            trigrams.append(trigram)
+    return tuple(trigrams)
+
+@lru_cache(maxsize=65536)
+def words(text):
+    return tuple(WORD.findall(text.lower()))
+
+@lru_cache(maxsize=1024)
+def query_trigrams(query):
+    """(trigram set, word count) of a query"""
+    query_words = words(query)
+    return frozenset(trigram for word in query_words for trigram in word_trigrams(word)), len(query_words)
+
+def word_similarity(query, text):
+    """
+    Close to pg_trgm's word_similarity(query, text): the best similarity
+    between the query's trigrams and a run of up to one more word of the
+    text than the query has, not counting unmatched trigrams at either end
+    of the run against it
+    """
+    trigrams, count = query_trigrams(query)
+    if not trigrams:
+        return 0.0
+    text_words = [matches(trigrams, word) for word in words(text)]
+    if not any(hits for _, hits in text_words):
+        return 0.0
+    span = count + 1
+    best = 0.0
+    for start in range(len(text_words)):
+        if not text_words[start][1]:
+            # Trimmed, the run is the same as one starting at its first matching word
+            continue
+        extent = []
+        first = last = None
+        for word_grams, hits in text_words[start:start + span]:
+            if hits:
+                if first is None:
+                    first = len(extent) + hits[0]
+                last = len(extent) + hits[-1]
+            extent.extend(word_grams)
+            if not hits:
+                continue
+            trimmed = set(extent[first:last + 1])
+            shared = len(trimmed & trigrams)
+            best = max(best, shared / (len(trigrams) + len(trimmed) - shared))
+    return best
+
+@lru_cache(maxsize=65536)
+def matches(trigrams, word):
+    """A word's trigrams and the positions of those among trigrams"""
+    word_grams = word_trigrams(word)
+    return word_grams, [i for i, trigram in enumerate(word_grams) if trigram in trigrams]
@@ -22,6 +22,18 @@ class BirdSoundSerializer(serializers.ModelSerializer):
 
 class SimilarBirdSerializer(serializers.ModelSerializer):
     similar_to_details = serializers.SerializerMethodField()
+    # Read by get_similar_to_details (see core/querysets.py)
+    select_related_fields = {'similar_to_details': ['similar_to']}
+    # Same dict as get_similar_to_details, for core/fast_serializers.py
+    fast_method_fields = {
+        'similar_to_details': {
+            'id': 'similar_to__id',
+            'name': 'similar_to__name',
+            'scientific_name': 'similar_to__scientific_name',
+            'image_url': 'similar_to__image_url',
+            'rarity': 'similar_to__rarity'
+        }
+    }
 
     class Meta:
         model = SimilarBird
@@ -40,6 +52,8 @@ class BirdSerializer(serializers.ModelSerializer):
     images = BirdImageSerializer(many=True, read_only=True)
     sounds = BirdSoundSerializer(many=True, read_only=True)
     similar_birds = SimilarBirdSerializer(many=True, read_only=True)
+    # Left out of ?fields= / ?expand= responses unless expanded (see core/fieldsets.py)
+    expandable_fields = ['images', 'sounds', 'similar_birds']
 
     class Meta:
         model = Bird
@@ -145,10 +159,12 @@ class ImageEnhancementSerializer(serializers.Serializer):
         return value
 
 class BirdIdentificationRequestSerializer(serializers.Serializer):
+    identification_type = serializers.ChoiceField(choices=['image', 'sound'], required=False)
     image = serializers.ImageField(required=False)
     sound = serializers.FileField(required=False)
     latitude = serializers.FloatField(required=False)
     longitude = serializers.FloatField(required=False)
+    week = serializers.IntegerField(required=False, min_value=1, max_value=48)
     location_name = serializers.CharField(required=False, max_length=255)
 
     def validate(self, data):
@@ -164,6 +180,8 @@ class BirdDetailSerializer(serializers.ModelSerializer):
     sounds = BirdSoundSerializer(many=True, read_only=True)
     similar_birds = SimilarBirdSerializer(many=True, read_only=True)
     categories = serializers.SerializerMethodField()
+    # Read by get_categories (see core/querysets.py)
+    prefetch_related_fields = {'categories': ['category_assignments__category']}
 
     class Meta:
         model = Bird
@@ -178,5 +196,6 @@ class BirdDetailSerializer(serializers.ModelSerializer):
         ]
 
     def get_categories(self, obj):
-        category_assignments = BirdCategoryAssignment.objects.filter(bird=obj)
+        # .all() so the prefetched assignments are used when present
+        category_assignments = obj.category_assignments.all()
         return BirdCategorySerializer([ca.category for ca in category_assignments], many=True).data
\ No newline at end of file
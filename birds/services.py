@@ -3,6 +3,7 @@ import json
 import google.generativeai as genai
 import openai
 from django.conf import settings
+from django.utils import timezone
 from PIL import Image
 import cloudinary.uploader
 from transformers import pipeline
@@ -95,7 +96,45 @@ class BirdIdentificationService:
             }
 
     @staticmethod
-    def identify_bird_from_sound(sound_file, location_name=None):
+    def identify_bird_from_sound(sound_file, location_name=None, latitude=None, longitude=None, week=None):
+        """Identify bird species from sound with the local BirdNET model"""
+        try:
+            from .birdnet_helper import identify_species, week_of_year
+
+            if week is None:
+                week = week_of_year(timezone.now().date())
+            species = identify_species(
+                sound_file,
+                lat=latitude if latitude is not None else -1,
+                lon=longitude if longitude is not None else -1,
+                week=week,
+                top_k=settings.BIRDNET_TOP_K,
+                min_confidence=settings.BIRDNET_MIN_CONFIDENCE
+            )
+            if species:
+                return {
+                    'success': True,
+                    'data': {
+                        'engine': 'birdnet',
+                        'identified_species': species[0]['common_name'],
+                        'scientific_name': species[0]['scientific_name'],
+                        'confidence_level': species[0]['confidence'] * 100,
+                        'species': species
+                    }
+                }
+            error = 'No bird species detected in the recording'
+        except Exception as e:
+            error = str(e)
+
+        if settings.BIRD_SOUND_LLM_FALLBACK:
+            return BirdIdentificationService.identify_bird_from_sound_llm(sound_file, location_name)
+        return {
+            'success': False,
+            'error': error
+        }
+
+    @staticmethod
+    def identify_bird_from_sound_llm(sound_file, location_name=None):
         """Identify bird from sound using ChatGPT-4 and Whisper"""
         try:
             # First transcribe the audio using Whisper
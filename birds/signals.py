@@ -0,0 +1,24 @@
+"""Invalidate cached bird details (birds/cache.py) when a bird or anything embedded in its detail changes"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import cache as bird_cache
+from .models import Bird, BirdImage, BirdSound, SimilarBird
+
+def invalidate(bird_ids):
+    # After commit, so a request cannot cache the old row under the new stamp
+    bird_ids = list(bird_ids)
+    transaction.on_commit(lambda: bird_cache.bump(bird_ids))
+
+@receiver([post_save, post_delete], sender=Bird)
+def bird_changed(sender, instance, **kwargs):
+    # Birds that list this one as similar embed its name, image and rarity
+    similar_from = SimilarBird.objects.filter(similar_to_id=instance.pk).values_list('bird_id', flat=True)
+    invalidate([instance.pk, *similar_from])
+
+@receiver([post_save, post_delete], sender=BirdImage)
+@receiver([post_save, post_delete], sender=BirdSound)
+@receiver([post_save, post_delete], sender=SimilarBird)
+def bird_part_changed(sender, instance, **kwargs):
+    invalidate([instance.bird_id])
@@ -0,0 +1,141 @@
+"""
+Server-side sonogram and waveform-peak rendering.
+
+Renders are content-addressed by the SHA-256 of the audio bytes and stored in
+default_storage under SONOGRAM_DIR:
+
+    sonograms/<hash>.png           spectrogram image
+    sonograms/<hash>.json          duration, sample rate and waveform peaks
+    sonograms/sources/<key>.json   BirdSound.sound_url -> <hash> pointer
+
+so each recording is decoded and rendered once and the outputs never change.
+"""
+import hashlib
+import io
+import json
+import os
+import tempfile
+
+import numpy as np
+import requests
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+
+from .birdnet_helper import decode_audio, file_hash
+
+SONOGRAM_DIR = 'sonograms'
+SONOGRAM_SAMPLE_RATE = 24000  # 12 kHz bandwidth covers almost all bird vocalisations
+SONOGRAM_N_FFT = 512
+SONOGRAM_HOP = 128
+SONOGRAM_DYNAMIC_RANGE_DB = 80.0
+STFT_BLOCK_FRAMES = 4096
+
+def stft_magnitude(sig, max_columns):
+    """
+    Magnitude spectrogram (freq x time) with time max-pooled down to at most
+    max_columns, computed in blocks so long recordings stay within memory.
+    """
+    if len(sig) < SONOGRAM_N_FFT:
+        sig = np.pad(sig, (0, SONOGRAM_N_FFT - len(sig)))
+    frames = np.lib.stride_tricks.sliding_window_view(sig, SONOGRAM_N_FFT)[::SONOGRAM_HOP]
+    window = np.hanning(SONOGRAM_N_FFT).astype('float32')
+    pool = max(1, -(-len(frames) // max_columns))
+    block = max(pool, STFT_BLOCK_FRAMES // pool * pool)
+
+    columns = []
+    for start in range(0, len(frames), block):
+        mag = np.abs(np.fft.rfft(frames[start:start + block] * window, axis=1)).astype('float32')
+        pad = -len(mag) % pool
+        if pad:
+            mag = np.pad(mag, ((0, pad), (0, 0)))
+        columns.append(mag.reshape(-1, pool, mag.shape[1]).max(axis=1))
+    # Drop the Nyquist bin so the image height is a power of two
+    return np.concatenate(columns)[:, :-1].T
+
+def sonogram_png(sig, max_width=None):
+    """Render a greyscale sonogram (dark = loud, low frequencies at the bottom) as PNG bytes"""
+    mag = stft_magnitude(sig, max_width or settings.SONOGRAM_MAX_WIDTH)
+    db = 20 * np.log10(mag + 1e-10)
+    top = db.max()
+    scaled = np.clip((db - (top - SONOGRAM_DYNAMIC_RANGE_DB)) / SONOGRAM_DYNAMIC_RANGE_DB, 0, 1)
+    pixels = (255 - scaled * 255).astype('uint8')[::-1]
+
+    buf = io.BytesIO()
+    Image.fromarray(pixels, mode='L').save(buf, format='PNG', optimize=True)
+    return buf.getvalue()
+
+def waveform_peaks(sig, buckets=None):
+    """Per-bucket min/max amplitudes for drawing a waveform preview"""
+    buckets = min(buckets or settings.SONOGRAM_PEAKS, max(1, len(sig)))
+    size = -(-len(sig) // buckets)
+    padded = np.pad(sig, (0, size * buckets - len(sig)))
+    frames = padded.reshape(buckets, size)
+    return {
+        'min': np.round(frames.min(axis=1), 4).tolist(),
+        'max': np.round(frames.max(axis=1), 4).tolist(),
+    }
+
+def download_sound(url):
+    """Download a remote recording to a temporary file; the caller removes it"""
+    suffix = os.path.splitext(url.split('?')[0])[1] or '.mp3'
+    response = requests.get(url, stream=True, timeout=30)
+    response.raise_for_status()
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as temp_sound_file:
+        for block in response.iter_content(1 << 16):
+            temp_sound_file.write(block)
+        return temp_sound_file.name
+
+def _save(name, content):
+    if not default_storage.exists(name):
+        default_storage.save(name, ContentFile(content))
+
+def _load_metadata(digest):
+    name = f'{SONOGRAM_DIR}/{digest}.json'
+    if not default_storage.exists(name):
+        return None
+    with default_storage.open(name) as f:
+        return json.load(f)
+
+def render_audio_file(path):
+    """Render (or fetch the stored render of) a local audio file, returning its metadata"""
+    digest = file_hash(path)
+    metadata = _load_metadata(digest)
+    if metadata is not None:
+        return metadata
+
+    sig = decode_audio(path, SONOGRAM_SAMPLE_RATE)
+    metadata = {
+        'hash': digest,
+        'duration': round(len(sig) / SONOGRAM_SAMPLE_RATE, 3),
+        'sample_rate': SONOGRAM_SAMPLE_RATE,
+        'max_frequency': SONOGRAM_SAMPLE_RATE // 2,
+        'peaks': waveform_peaks(sig),
+    }
+    _save(f'{SONOGRAM_DIR}/{digest}.png', sonogram_png(sig))
+    # Metadata is written last: its presence marks a complete render
+    _save(f'{SONOGRAM_DIR}/{digest}.json', json.dumps(metadata).encode())
+    return metadata
+
+def render_bird_sound(sound):
+    """Render a BirdSound, downloading sound_url only the first time it is seen"""
+    source_key = hashlib.sha256(sound.sound_url.encode()).hexdigest()
+    pointer = f'{SONOGRAM_DIR}/sources/{source_key}.json'
+    if default_storage.exists(pointer):
+        with default_storage.open(pointer) as f:
+            metadata = _load_metadata(json.load(f)['hash'])
+        if metadata is not None:
+            return metadata
+
+    temp_sound_path = download_sound(sound.sound_url)
+    try:
+        metadata = render_audio_file(temp_sound_path)
+    finally:
+        os.remove(temp_sound_path)
+    _save(pointer, json.dumps({'hash': metadata['hash']}).encode())
+    return metadata
+
+def open_sonogram(digest):
+    """Open a stored sonogram PNG; digest must be a SHA-256 hex string"""
+    return default_storage.open(f'{SONOGRAM_DIR}/{digest}.png', 'rb')
@@ -0,0 +1,222 @@
+"""
+Real-time sound identification over WebSocket, served from core/asgi.py.
+
+Clients connect to /ws/v2/birds/stream/ with query parameters:
+
+    token        JWT access token (required)
+    sample_rate  rate of the PCM frames they send (default 48000)
+    format       pcm16 (little-endian int16, default) or f32 (float32)
+    lat, lon     recording location (optional)
+    week         BirdNET week 1-48 (optional, defaults to the current week)
+    hop          seconds between analyses (default BIRDNET_STREAM_HOP_SECONDS)
+
+and then send mono audio as binary frames. The last 3 s of audio are kept in
+a ring buffer per session, and every hop the window is run through BirdNET;
+detections are pushed back as JSON text frames. A text frame
+{"type": "stop"} ends the session.
+"""
+import asyncio
+import json
+import logging
+import time
+from urllib.parse import parse_qs
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import birdnet_helper
+
+STREAM_PATH = '/ws/v2/birds/stream/'
+WINDOW_SECONDS = 3.0
+MODEL_SAMPLE_RATE = 48000
+SAMPLE_FORMATS = {'pcm16': ('<i2', 1 / 32768.0), 'f32': ('<f4', 1.0)}
+
+# Close codes
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_BAD_REQUEST = 4400
+CLOSE_TRY_AGAIN_LATER = 1013
+
+logger = logging.getLogger(__name__)
+
+_sessions = 0
+_inference_slots = None
+
+def get_inference_slots():
+    """Semaphore bounding concurrent stream inferences so uploads keep pool capacity"""
+    global _inference_slots
+    if _inference_slots is None:
+        _inference_slots = asyncio.Semaphore(settings.BIRDNET_STREAM_MAX_CONCURRENT_INFERENCES)
+    return _inference_slots
+
+class RingBuffer:
+    """Fixed-size float32 buffer holding the most recent samples"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype='float32')
+        self._end = 0
+        self.filled = 0
+
+    def write(self, samples):
+        samples = samples[-self.capacity:]
+        n = len(samples)
+        first = min(n, self.capacity - self._end)
+        self._data[self._end:self._end + first] = samples[:first]
+        self._data[:n - first] = samples[first:]
+        self._end = (self._end + n) % self.capacity
+        self.filled = min(self.capacity, self.filled + n)
+
+    def read(self):
+        """Buffered samples in chronological order"""
+        ordered = np.concatenate([self._data[self._end:], self._data[:self._end]])
+        return ordered[self.capacity - self.filled:]
+
+def _param(params, name, cast, default):
+    values = params.get(name)
+    return cast(values[0]) if values else default
+
+def analyze_window(window, rate, mdata, species_mask, sensitivity, min_confidence):
+    """Run one buffered window through a pooled interpreter (called in a worker thread)"""
+    sig = birdnet_helper.resample(window, rate, MODEL_SAMPLE_RATE)
+    chunk = np.zeros(int(WINDOW_SECONDS * MODEL_SAMPLE_RATE), dtype='float32')
+    chunk[-min(len(sig), len(chunk)):] = sig[-len(chunk):]
+    with birdnet_helper.get_interpreter_pool().checkout() as model:
+        prediction = birdnet_helper.invoke_model([np.expand_dims(chunk, 0), mdata], *model)
+    detections = []
+    for class_index, score in birdnet_helper.postprocess_prediction(prediction, sensitivity, species_mask):
+        if score < min_confidence:
+            continue
+        info = birdnet_helper.species_info(class_index)
+        detections.append({
+            'scientific_name': info['scientific_name'],
+            'common_name': info['common_name'],
+            'bird_id': info['bird_id'],
+            'confidence': float(score),
+        })
+    return detections
+
+def _log_hop_failure(task):
+    """Done callback retrieving a hop task's exception so it is logged rather than lost"""
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("BirdNET stream hop failed", exc_info=task.exception())
+
+async def _send_json(send, payload):
+    await send({'type': 'websocket.send', 'text': json.dumps(payload)})
+
+async def stream_identification(scope, receive, send):
+    """ASGI handler for one streaming identification session"""
+    global _sessions
+
+    message = await receive()
+    if message['type'] != 'websocket.connect':
+        return
+
+    params = parse_qs(scope.get('query_string', b'').decode())
+    try:
+        AccessToken(_param(params, 'token', str, ''))
+    except TokenError:
+        await send({'type': 'websocket.close', 'code': CLOSE_UNAUTHORIZED})
+        return
+
+    try:
+        rate = _param(params, 'sample_rate', int, MODEL_SAMPLE_RATE)
+        dtype, scale = SAMPLE_FORMATS[_param(params, 'format', str, 'pcm16')]
+        lat = _param(params, 'lat', float, -1)
+        lon = _param(params, 'lon', float, -1)
+        week = _param(params, 'week', int, birdnet_helper.week_of_year(timezone.now().date()))
+        hop = _param(params, 'hop', float, settings.BIRDNET_STREAM_HOP_SECONDS)
+        if not (8000 <= rate <= 96000 and 0.25 <= hop <= WINDOW_SECONDS):
+            raise ValueError
+    except (KeyError, ValueError):
+        await send({'type': 'websocket.close', 'code': CLOSE_BAD_REQUEST})
+        return
+
+    if _sessions >= settings.BIRDNET_STREAM_MAX_SESSIONS:
+        await send({'type': 'websocket.close', 'code': CLOSE_TRY_AGAIN_LATER})
+        return
+
+    _sessions += 1
+    pending = None
+    try:
+        await send({'type': 'websocket.accept'})
+        loop = asyncio.get_running_loop()
+        week = max(1, min(week, 48))
+        mdata = np.expand_dims(birdnet_helper.convert_metadata(np.array([lat, lon, week])), 0)
+        species_mask = await loop.run_in_executor(None, birdnet_helper.species_filter, lat, lon, week)
+        buffer = RingBuffer(int(WINDOW_SECONDS * rate))
+        hop_samples = int(hop * rate)
+        min_samples = int(1.5 * rate)
+        received = 0
+        since_last = 0
+        skipped_hops = 0
+
+        async def run_hop(window, stream_time):
+            nonlocal skipped_hops
+            slots = get_inference_slots()
+            if slots.locked():
+                # Drop the hop rather than queue behind other sessions: stale results are useless
+                skipped_hops += 1
+                return
+            async with slots:
+                started = time.monotonic()
+                inference = loop.run_in_executor(
+                    None, analyze_window, window, rate, mdata, species_mask,
+                    settings.BIRDNET_STREAM_SENSITIVITY, settings.BIRDNET_MIN_CONFIDENCE
+                )
+                try:
+                    detections = await asyncio.shield(inference)
+                except asyncio.CancelledError:
+                    # The executor thread can't be stopped: hold the slot until it is done
+                    await asyncio.wait([inference])
+                    if not inference.cancelled():
+                        inference.exception()
+                    raise
+            await _send_json(send, {
+                'type': 'detections',
+                'start_time': round(max(0.0, stream_time - WINDOW_SECONDS), 3),
+                'end_time': round(stream_time, 3),
+                'latency_ms': round((time.monotonic() - started) * 1000, 1),
+                'skipped_hops': skipped_hops,
+                'detections': detections,
+            })
+
+        while True:
+            message = await receive()
+            if message['type'] == 'websocket.disconnect':
+                break
+            if message.get('text') is not None:
+                try:
+                    control = json.loads(message['text'])
+                except ValueError:
+                    control = {}
+                if not isinstance(control, dict):
+                    control = {}
+                if control.get('type') == 'stop':
+                    await send({'type': 'websocket.close', 'code': 1000})
+                    break
+                continue
+
+            frame = message.get('bytes') or b''
+            itemsize = np.dtype(dtype).itemsize
+            samples = np.frombuffer(frame[:len(frame) - len(frame) % itemsize], dtype=dtype).astype('float32') * scale
+            buffer.write(samples)
+            received += len(samples)
+            since_last += len(samples)
+
+            if since_last >= hop_samples and buffer.filled >= min_samples:
+                since_last = 0
+                if pending is not None and not pending.done():
+                    # The previous hop of this session is still running
+                    skipped_hops += 1
+                    continue
+                pending = asyncio.ensure_future(run_hop(buffer.read().copy(), received / rate))
+                pending.add_done_callback(_log_hop_failure)
+    finally:
+        if pending is not None:
+            pending.cancel()
+            # Waits for a running inference; failures are logged by _log_hop_failure
+            await asyncio.wait([pending])
+        _sessions -= 1
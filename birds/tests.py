@@ -1,3 +1,73 @@
-from django.test import TestCase
+import tempfile
+from contextlib import contextmanager
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from birds.models import Bird, BirdImage
+from core.testing import QueryBudgetTestMixin, budgeted_url_names, seed_query_budget_data
+
+class QueryBudgetTests(QueryBudgetTestMixin, APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = seed_query_budget_data(rows=20)
+        self.bird = Bird.objects.first()
+        BirdImage.objects.bulk_create(
+            BirdImage(bird=self.bird, image_url=f'https://example.com/{i}.jpg', is_primary=i == 0) for i in range(5)
+        )
+
+    def test_every_budgeted_view_is_covered(self):
+        self.assertEqual(budgeted_url_names('birds'), {'birds:bird_list', 'birds:bird_details'})
+
+    def test_bird_list(self):
+        self.assertWithinQueryBudget(reverse('birds:bird_list'), user=self.user)
+
+    def test_bird_list_search(self):
+        response = self.assertWithinQueryBudget(reverse('birds:bird_list') + '?search=Seeded&rarity=C', user=self.user)
+        self.assertEqual(len(response.data), 20)
+
+    def test_bird_details(self):
+        path = reverse('birds:bird_details', args=[self.bird.pk])
+        # Through the serializer when the cache is bypassed or not shared, and rendered on a cache miss
+        self.assertWithinQueryBudget(path, user=self.user)
+        self.assertWithinQueryBudget(path + '?fields=id,name,images', user=self.user)
+        with shared_cache():
+            self.assertWithinQueryBudget(path, user=self.user)
+
+@contextmanager
+def shared_cache():
+    # A cache every process sees, standing in for Redis
+    with tempfile.TemporaryDirectory() as location:
+        with override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location}
+        }):
+            yield
+
+class BirdDetailCacheTests(APITestCase):
+    def setUp(self):
+        self.user = seed_query_budget_data(rows=1)
+        self.client.force_authenticate(self.user)
+        self.path = reverse('birds:bird_details', args=[Bird.objects.get().pk])
+
+    def test_per_process_cache_is_not_used(self):
+        cache.clear()
+        response = self.client.get(self.path)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Cache', response)
+        self.assertNotIn('ETag', response)
+        self.assertNotIn('ETag', self.client.get(reverse('birds:bird_list')))
+
+    def test_shared_cache(self):
+        with shared_cache():
+            first = self.client.get(self.path)
+            second = self.client.get(self.path)
+            self.assertEqual((first['X-Cache'], second['X-Cache']), ('MISS', 'HIT'))
+            self.assertEqual(self.client.get(self.path, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                BirdImage.objects.create(bird=Bird.objects.get(), image_url='https://example.com/new.jpg')
+            response = self.client.get(self.path, HTTP_IF_NONE_MATCH=first['ETag'])
+            self.assertEqual((response.status_code, response['X-Cache']), (200, 'MISS'))
+            self.assertNotEqual(response['ETag'], first['ETag'])
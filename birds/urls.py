@@ -3,7 +3,9 @@ from .views import (
     EnhanceImageView, IdentifyBirdView, BirdDetailView,
     BirdListView, UserBirdIdentificationsView,
     BirdBrainAskView, BirdBrainSearchLocationView, BirdBrainChatView,
-    CommonFeederBirdsView, BirdsByCategoryView
+    CommonFeederBirdsView, BirdsByCategoryView,
+    BirdSoundSonogramView, SoundSonogramUploadView, SonogramImageView,
+    SoundMatchView, BatchIdentifySoundView
 )
 
 app_name = 'birds'
@@ -12,11 +14,18 @@ urlpatterns = [
     # Bird identification endpoints
     path('enhance/', EnhanceImageView.as_view(), name='enhance_image'),
     path('identify/', IdentifyBirdView.as_view(), name='identify_bird'),
+    path('identify/batch/', BatchIdentifySoundView.as_view(), name='identify_bird_batch'),
 
     # Bird information endpoints
     path('details/<int:pk>/', BirdDetailView.as_view(), name='bird_details'),
     path('list/', BirdListView.as_view(), name='bird_list'),
 
+    # Sonograms and waveform previews
+    path('sounds/<int:pk>/sonogram/', BirdSoundSonogramView.as_view(), name='bird_sound_sonogram'),
+    path('sounds/sonogram/', SoundSonogramUploadView.as_view(), name='sound_sonogram_upload'),
+    path('sonograms/<str:digest>.png', SonogramImageView.as_view(), name='sonogram_image'),
+    path('sounds/match/', SoundMatchView.as_view(), name='sound_match'),
+
     # User-specific endpoints
     path('identifications/', UserBirdIdentificationsView.as_view(), name='user_identifications'),
 
@@ -22,10 +22,13 @@ from .serializers import (
     SpotBirdSightingSerializer
 )
 from .services import BirdIdentificationService
-from django.db.models import Count, Q
+from django.db.models import Count
 from django.utils import timezone
 from datetime import timedelta
-from core.views import BaseAPIView
+from core.querysets import optimize_for_serializer
+from core.conditional import make_etag
+from core.pagination import KeysetPagination
+from core.views import BaseAPIView, CompiledListMixin, ConditionalGetMixin, OptimizedQuerysetMixin, SparseFieldsetMixin
 from rest_framework.exceptions import ValidationError
 import cloudinary
 import cloudinary.uploader
@@ -46,6 +49,20 @@ import tempfile
 import os
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from rest_framework.permissions import AllowAny
+from . import birdnet_helper, fingerprint, sonogram
+from . import cache as bird_cache
+from . import search as bird_search
+from asgiref.sync import sync_to_async
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import functools
+import json
+import re
+import time
+import zipfile
 
 # Create your views here.
 
@@ -113,6 +130,8 @@ class IdentifyBirdView(BaseAPIView):
 
             image_url = ''
             sound_url = ''
+            common_name = None
+            species = []
 
             if identification_type == 'image' or (not identification_type and data.get('image')):
                 # Handle image identification
@@ -146,7 +165,7 @@ class IdentifyBirdView(BaseAPIView):
                 confidence = float(result.get('score', 0.8)) * 100
                 ai_response = result
 
-            elif identification_type == 'sound':
+            elif identification_type == 'sound' or (not identification_type and data.get('sound')):
                 # Handle sound identification
                 sound_data = data.get('sound')
                 if not sound_data:
@@ -157,28 +176,51 @@ class IdentifyBirdView(BaseAPIView):
                 sound_name = default_storage.save(os.path.join(sound_dir, sound_data.name), ContentFile(sound_data.read()))
                 sound_url = settings.MEDIA_URL + sound_name
 
-                # Use Gemini for sound identification (existing logic)
-                genai.configure(api_key=settings.GEMINI_API_KEY)
-                model = genai.GenerativeModel('gemini-pro')
-                response = model.generate_content(
-                    f"Identify this bird species from its sound. Return only the scientific name. Sound URL: {sound_url}"
-                )
-                bird_name = response.text.strip()
-                confidence = 0.8 * 100
-                ai_response = {'gemini_response': response.text}
+                # Reset file pointer before reading again
+                sound_data.seek(0)
+
+                # Identify locally with BirdNET, using the location and week (defaults to the current week)
+                suffix = os.path.splitext(sound_data.name)[1] or '.wav'
+                with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as temp_sound_file:
+                    temp_sound_file.write(sound_data.read())
+                    temp_sound_path = temp_sound_file.name
+
+                try:
+                    result = BirdIdentificationService.identify_bird_from_sound(
+                        temp_sound_path,
+                        location_name=data.get('location_name'),
+                        latitude=data.get('latitude'),
+                        longitude=data.get('longitude'),
+                        week=data.get('week')
+                    )
+                finally:
+                    os.remove(temp_sound_path)
+
+                if not result['success']:
+                    raise ValidationError(result['error'])
+
+                ai_response = result['data']
+                bird_name = ai_response.get('scientific_name') or ai_response['identified_species']
+                common_name = ai_response.get('identified_species', bird_name)
+                confidence = float(ai_response.get('confidence_level', 0))
+                species = ai_response.get('species', [])
 
             else:
                 raise ValidationError("Invalid identification type")
 
-            # Find or create bird
-            bird, created = Bird.objects.get_or_create(
-                scientific_name=bird_name,
-                defaults={
-                    'name': bird_name,
-                    'description': 'Automatically identified bird',
-                    'image_url': image_url
-                }
-            )
+            # Find or create bird (BirdNET results may already carry the Bird id)
+            bird = None
+            if species and species[0].get('bird_id'):
+                bird = Bird.objects.filter(pk=species[0]['bird_id']).first()
+            if bird is None:
+                bird, created = Bird.objects.get_or_create(
+                    scientific_name=bird_name,
+                    defaults={
+                        'name': common_name or bird_name,
+                        'description': 'Automatically identified bird',
+                        'image_url': image_url
+                    }
+                )
 
             # Create identification record
             identification = BirdIdentification.objects.create(
@@ -198,32 +240,430 @@ class IdentifyBirdView(BaseAPIView):
                 'predicted_species': bird_name,
                 'image_url': image_url,
                 'sound_url': sound_url,
+                'species': species,
                 'identification': BirdIdentificationSerializer(identification).data
             })
 
         except Exception as e:
             raise ValidationError(str(e))
 
-class BirdDetailView(RetrieveAPIView):
+BATCH_AUDIO_EXTENSIONS = ('.wav', '.mp3', '.flac', '.ogg', '.m4a')
+
+def _resolve_bird(bird_name, common_name, species, birds):
+    """Bird for an identification, preferring the id BirdNET already linked (birds is an in_bulk map)"""
+    if species and species[0].get('bird_id') in birds:
+        return birds[species[0]['bird_id']]
+    bird, created = Bird.objects.get_or_create(
+        scientific_name=bird_name,
+        defaults={
+            'name': common_name or bird_name,
+            'description': 'Automatically identified bird',
+            'image_url': ''
+        }
+    )
+    return bird
+
+class BatchIdentifySoundView(BaseAPIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Identify birds in several recordings at once (multiple `sounds` files and/or a ZIP `archive`). "
+            "Results stream back as NDJSON, one line per file as it completes, followed by a summary line."
+        ),
+        manual_parameters=[
+            openapi.Parameter('sounds', openapi.IN_FORM, type=openapi.TYPE_FILE, description="Audio files (repeat the field)"),
+            openapi.Parameter('archive', openapi.IN_FORM, type=openapi.TYPE_FILE, description="ZIP of audio files"),
+            openapi.Parameter('latitude', openapi.IN_FORM, type=openapi.TYPE_NUMBER),
+            openapi.Parameter('longitude', openapi.IN_FORM, type=openapi.TYPE_NUMBER),
+            openapi.Parameter('location_name', openapi.IN_FORM, type=openapi.TYPE_STRING),
+            openapi.Parameter('week', openapi.IN_FORM, type=openapi.TYPE_INTEGER, description="BirdNET week (1-48)")
+        ],
+        responses={
+            200: openapi.Response(
+                description="NDJSON stream",
+                examples={
+                    "application/x-ndjson": (
+                        '{"type": "result", "file": "unit1/0600.wav", "success": true, "duration": 60.0, '
+                        '"identified_species": "Common Raven", "confidence_level": 81.2, "species": [...]}\n'
+                        '{"type": "summary", "files": 12, "failed": 0, "saved": 11, "audio_minutes": 12.0, '
+                        '"wall_minutes": 0.4, "audio_minutes_per_minute": 30.0}\n'
+                    )
+                }
+            ),
+            400: "Bad Request - No audio files or too many files"
+        }
+    )
+    def post(self, request):
+        try:
+            latitude = float(request.data['latitude']) if request.data.get('latitude') else None
+            longitude = float(request.data['longitude']) if request.data.get('longitude') else None
+            week = int(request.data['week']) if request.data.get('week') else None
+        except ValueError:
+            raise ValidationError("Invalid latitude, longitude or week")
+        location_name = request.data.get('location_name', '')
+
+        uploads = [(sound_data.name, sound_data.read) for sound_data in request.FILES.getlist('sounds')]
+        archive = request.FILES.get('archive')
+        if archive:
+            uploads.extend(self._archive_entries(archive))
+        if not uploads:
+            raise ValidationError("Upload audio files as 'sounds' or a ZIP as 'archive'")
+        if len(uploads) > settings.BIRDNET_BATCH_MAX_FILES:
+            raise ValidationError(f"At most {settings.BIRDNET_BATCH_MAX_FILES} files per batch")
+
+        # Everything is written to disk before streaming starts so the uploads can be released
+        files = []
+        for name, read in uploads:
+            content = read()
+            sound_name = default_storage.save(os.path.join('bird_sounds', os.path.basename(name)), ContentFile(content))
+            suffix = os.path.splitext(name)[1] or '.wav'
+            with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as temp_sound_file:
+                temp_sound_file.write(content)
+            files.append((name, settings.MEDIA_URL + sound_name, temp_sound_file.name))
+
+        params = {'latitude': latitude, 'longitude': longitude, 'location_name': location_name, 'week': week}
+        response = StreamingHttpResponse(
+            self._stream_results(request.user, files, params),
+            content_type='application/x-ndjson'
+        )
+        response['X-Accel-Buffering'] = 'no'
+        # Also covers a stream that is never started or is abandoned part way
+        response._resource_closers.append(functools.partial(_remove_files, [path for _, _, path in files]))
+        return response
+
+    def _archive_entries(self, archive):
+        try:
+            zf = zipfile.ZipFile(archive)
+        except zipfile.BadZipFile:
+            raise ValidationError("archive is not a valid ZIP file")
+        entries = [
+            info for info in zf.infolist()
+            if not info.is_dir()
+            and not os.path.basename(info.filename).startswith('.')
+            and info.filename.lower().endswith(BATCH_AUDIO_EXTENSIONS)
+        ]
+        if sum(info.file_size for info in entries) > settings.BIRDNET_BATCH_MAX_ARCHIVE_BYTES:
+            raise ValidationError("archive is too large once extracted")
+        return [(info.filename, functools.partial(zf.read, info)) for info in entries]
+
+    async def _stream_results(self, user, files, params):
+        """
+        Async so ASGI servers send each line as its file finishes; Django
+        drains a sync iterator completely before sending anything. Analysis
+        runs on a thread pool and the inserts through sync_to_async.
+        """
+        started = time.monotonic()
+        audio_seconds = 0.0
+        failed = 0
+        saved = 0
+        pending = []
+
+        def analyze(name, sound_url, path):
+            try:
+                duration = birdnet_helper.audio_duration(path)
+                result = BirdIdentificationService.identify_bird_from_sound(
+                    path,
+                    location_name=params['location_name'],
+                    latitude=params['latitude'],
+                    longitude=params['longitude'],
+                    week=params['week']
+                )
+            except Exception as e:
+                duration, result = 0.0, {'success': False, 'error': str(e)}
+            finally:
+                _remove_files([path])
+            return name, sound_url, duration, result
+
+        def flush():
+            nonlocal saved
+            birds = Bird.objects.in_bulk({
+                data['species'][0]['bird_id'] for _, data in pending
+                if data.get('species') and data['species'][0].get('bird_id') is not None
+            })
+            rows = []
+            for sound_url, data in pending:
+                bird_name = data.get('scientific_name') or data['identified_species']
+                common_name = data.get('identified_species', bird_name)
+                rows.append(BirdIdentification(
+                    user=user,
+                    bird=_resolve_bird(bird_name, common_name, data.get('species'), birds),
+                    sound_url=sound_url,
+                    identified_species=bird_name,
+                    confidence_level=float(data.get('confidence_level', 0)),
+                    ai_response=data,
+                    latitude=params['latitude'],
+                    longitude=params['longitude'],
+                    location_name=params['location_name']
+                ))
+            BirdIdentification.objects.bulk_create(rows)
+            saved += len(rows)
+            pending.clear()
+
+        # One worker per pooled interpreter: more threads would only queue on checkout
+        executor = ThreadPoolExecutor(max_workers=birdnet_helper.INTERPRETER_POOL_SIZE)
+        loop = asyncio.get_running_loop()
+        futures = [loop.run_in_executor(executor, analyze, *entry) for entry in files]
+        try:
+            for future in asyncio.as_completed(futures):
+                name, sound_url, duration, result = await future
+                audio_seconds += duration
+                line = {'type': 'result', 'file': name, 'sound_url': sound_url, 'duration': round(duration, 2)}
+                if result['success']:
+                    data = result['data']
+                    pending.append((sound_url, data))
+                    line.update({
+                        'success': True,
+                        'identified_species': data['identified_species'],
+                        'scientific_name': data.get('scientific_name'),
+                        'confidence_level': data.get('confidence_level'),
+                        'species': data.get('species', []),
+                    })
+                else:
+                    failed += 1
+                    line.update({'success': False, 'error': result['error']})
+                if len(pending) >= settings.BIRDNET_BATCH_INSERT_SIZE:
+                    await sync_to_async(flush)()
+                yield json.dumps(line) + '\n'
+        finally:
+            # Files not picked up yet when the client goes away are never analysed, nor removed by analyze()
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+            _remove_files([path for future, (_, _, path) in zip(futures, files) if future.cancelled()])
+            # Results already streamed as successes are saved even if the client has gone
+            if pending:
+                await sync_to_async(flush)()
+
+        wall_seconds = time.monotonic() - started
+        yield json.dumps({
+            'type': 'summary',
+            'files': len(files),
+            'failed': failed,
+            'saved': saved,
+            'audio_minutes': round(audio_seconds / 60, 2),
+            'wall_minutes': round(wall_seconds / 60, 2),
+            'audio_minutes_per_minute': round(audio_seconds / wall_seconds, 1) if wall_seconds else None,
+        }) + '\n'
+
+def _remove_files(paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+class SonogramResponseMixin:
+    """Shared response for sonogram renders, revalidated by content hash"""
+
+    def sonogram_response(self, request, metadata):
+        etag = '"%s"' % metadata['hash']
+        if request.headers.get('If-None-Match') == etag:
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response({
+                **metadata,
+                'sonogram_url': request.build_absolute_uri(
+                    reverse('birds:sonogram_image', args=[metadata['hash']])
+                ),
+            })
+        response['ETag'] = etag
+        response['Cache-Control'] = f'private, max-age={settings.SONOGRAM_METADATA_MAX_AGE}'
+        return response
+
+class BirdSoundSonogramView(SonogramResponseMixin, BaseAPIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Sonogram and waveform peaks for a reference bird sound",
+        responses={
+            200: openapi.Response(
+                description="Render metadata",
+                examples={
+                    "application/json": {
+                        "hash": "3f1c...",
+                        "duration": 12.5,
+                        "sample_rate": 24000,
+                        "max_frequency": 12000,
+                        "peaks": {"min": [-0.12, -0.4], "max": [0.11, 0.38]},
+                        "sonogram_url": "https://example.com/api/v2/birds/sonograms/3f1c....png"
+                    }
+                }
+            ),
+            404: "Not Found - Sound does not exist"
+        }
+    )
+    def get(self, request, pk):
+        sound = BirdSound.objects.get(pk=pk)
+        try:
+            metadata = sonogram.render_bird_sound(sound)
+        except Exception as e:
+            raise ValidationError(str(e))
+        return self.sonogram_response(request, metadata)
+
+class SoundSonogramUploadView(SonogramResponseMixin, BaseAPIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Sonogram and waveform peaks for an uploaded recording",
+        manual_parameters=[
+            openapi.Parameter('sound', openapi.IN_FORM, type=openapi.TYPE_FILE, required=True)
+        ]
+    )
+    def post(self, request):
+        sound_data = request.FILES.get('sound')
+        if not sound_data:
+            raise ValidationError("Sound file is required")
+
+        suffix = os.path.splitext(sound_data.name)[1] or '.wav'
+        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as temp_sound_file:
+            for chunk in sound_data.chunks():
+                temp_sound_file.write(chunk)
+            temp_sound_path = temp_sound_file.name
+
+        try:
+            metadata = sonogram.render_audio_file(temp_sound_path)
+        except Exception as e:
+            raise ValidationError(str(e))
+        finally:
+            os.remove(temp_sound_path)
+        return self.sonogram_response(request, metadata)
+
+class SonogramImageView(APIView):
+    # Content-addressed and immutable; public so <img> tags and CDNs can fetch it without a JWT
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request, digest):
+        if not re.fullmatch(r'[0-9a-f]{64}', digest):
+            return HttpResponse(status=status.HTTP_404_NOT_FOUND)
+        etag = '"%s"' % digest
+        if request.headers.get('If-None-Match') == etag:
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            try:
+                response = FileResponse(sonogram.open_sonogram(digest), content_type='image/png')
+            except FileNotFoundError:
+                return HttpResponse(status=status.HTTP_404_NOT_FOUND)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'public, max-age=31536000, immutable'
+        return response
+
+class SoundMatchView(BaseAPIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Find the reference bird sounds that an uploaded clip sounds like",
+        manual_parameters=[
+            openapi.Parameter('sound', openapi.IN_FORM, type=openapi.TYPE_FILE, required=True),
+            openapi.Parameter('top', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, default=5)
+        ],
+        responses={
+            200: openapi.Response(
+                description="Closest reference sounds",
+                examples={
+                    "application/json": {
+                        "query_hashes": 1840,
+                        "lookup_ms": 6.2,
+                        "matches": [
+                            {
+                                "sound": {"id": 4, "sound_url": "https://example.com/raven.mp3", "sound_type": "call", "description": "Alarm call"},
+                                "bird": {"id": 12, "name": "Common Raven", "scientific_name": "Corvus corax"},
+                                "score": 87,
+                                "offset": 3.41
+                            }
+                        ]
+                    }
+                }
+            )
+        }
+    )
+    def post(self, request):
+        sound_data = request.FILES.get('sound')
+        if not sound_data:
+            raise ValidationError("Sound file is required")
+        try:
+            top = min(int(request.query_params.get('top', 5)), 20)
+        except ValueError:
+            raise ValidationError("top must be an integer")
+
+        suffix = os.path.splitext(sound_data.name)[1] or '.wav'
+        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as temp_sound_file:
+            for chunk in sound_data.chunks():
+                temp_sound_file.write(chunk)
+            temp_sound_path = temp_sound_file.name
+
+        try:
+            result = fingerprint.match_file(temp_sound_path, top=top)
+        except Exception as e:
+            raise ValidationError(str(e))
+        finally:
+            os.remove(temp_sound_path)
+
+        return Response({
+            'query_hashes': result['query_hashes'],
+            'lookup_ms': result['lookup_ms'],
+            'matches': [
+                {
+                    'sound': BirdSoundSerializer(match['sound']).data,
+                    'bird': {
+                        'id': match['sound'].bird.id,
+                        'name': match['sound'].bird.name,
+                        'scientific_name': match['sound'].bird.scientific_name,
+                    },
+                    'score': match['score'],
+                    'offset': match['offset'],
+                }
+                for match in result['matches']
+            ],
+        })
+
+class BirdDetailView(ConditionalGetMixin, SparseFieldsetMixin, OptimizedQuerysetMixin, RetrieveAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = BirdSerializer
+    query_budget = 4
 
     def get_queryset(self):
         return Bird.objects.all()
 
     def retrieve(self, request, *args, **kwargs):
         try:
-            instance = self.get_object()
-            serializer = self.get_serializer(instance)
-            return Response(serializer.data)
+            if not bird_cache.cacheable(request):
+                instance = self.get_object()
+                serializer = self.get_serializer(instance)
+                return Response(serializer.data)
+            body, hit = bird_cache.get_or_render(self.kwargs['pk'], self.render_detail)
+            response = HttpResponse(body, content_type=request.accepted_renderer.media_type)
+            response['X-Cache'] = 'HIT' if hit else 'MISS'
+            return response
         except Exception as e:
             raise ValidationError(str(e))
 
-class BirdListView(ListAPIView):
+    def render_detail(self):
+        serializer = self.get_serializer(self.get_object())
+        return self.request.accepted_renderer.render(
+            serializer.data, self.request.accepted_media_type, self.get_renderer_context()
+        )
+
+    def get_validators(self):
+        # The cache's version stamp changes whenever anything in the body does (birds/signals.py).
+        # Bird.updated_at misses image, sound and similar-bird edits, so without a shared stamp send no validators.
+        if not bird_cache.shared():
+            return None, None
+        stamp = bird_cache.version(self.kwargs['pk'])
+        etag = make_etag(self.request.get_full_path(), self.request.accepted_media_type, stamp)
+        return etag, stamp // 10**9
+
+class BirdListView(ConditionalGetMixin, SparseFieldsetMixin, OptimizedQuerysetMixin, ListAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = BirdSerializer
+    query_budget = 6
     @swagger_auto_schema(
         operation_description="List all birds with optional filtering",
         manual_parameters=[
@@ -272,27 +712,37 @@ class BirdListView(ListAPIView):
         try:
             queryset = Bird.objects.all()
 
-            # Filter by name or scientific name
-            search = self.request.query_params.get('search')
-            if search:
-                queryset = queryset.filter(
-                    Q(name__icontains=search) |
-                    Q(scientific_name__icontains=search)
-                )
-
             # Filter by rarity
             rarity = self.request.query_params.get('rarity')
             if rarity:
                 queryset = queryset.filter(rarity=rarity)
 
+            # Search by name or scientific name, best match first
+            search = self.request.query_params.get('search')
+            if search:
+                # The validators and the list both build the queryset; score the rows once
+                if not hasattr(self, '_search_queryset'):
+                    self._search_queryset = bird_search.search(queryset, search, bird_search.BIRD_FIELDS)
+                return self._search_queryset.all()
+
             return queryset.order_by('name')
         except Exception as e:
             raise ValidationError(str(e))
 
+    def get_validators(self):
+        if not bird_cache.shared():
+            return None, None
+        return super().get_validators()
+
+    def get_etag_parts(self):
+        # Embedded images, sounds and similar birds don't touch Bird.updated_at
+        return (bird_cache.catalog_version(),)
+
 class UserBirdIdentificationsView(ListAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = BirdIdentificationSerializer
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         return BirdIdentification.objects.filter(user=self.request.user).order_by('-created_at')
@@ -376,11 +826,13 @@ class UserRecentActivityView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        activities = UserActivity.objects.filter(user=request.user)[:10]
+        activities = optimize_for_serializer(
+            UserActivity.objects.filter(user=request.user), UserActivitySerializer()
+        )[:10]
         serializer = UserActivitySerializer(activities, many=True)
         return Response(serializer.data)
 
-class UserRecentActivityViewAllView(generics.ListAPIView):
+class UserRecentActivityViewAllView(SparseFieldsetMixin, OptimizedQuerysetMixin, generics.ListAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = UserActivitySerializer
@@ -388,7 +840,7 @@ class UserRecentActivityViewAllView(generics.ListAPIView):
     def get_queryset(self):
         return UserActivity.objects.filter(user=self.request.user)
 
-class UserRecentActivitySearchView(generics.ListAPIView):
+class UserRecentActivitySearchView(SparseFieldsetMixin, OptimizedQuerysetMixin, generics.ListAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = UserActivitySerializer
@@ -416,7 +868,7 @@ class NearbyBirdActivityView(APIView):
                 "error": "No location data available"
             }, status=status.HTTP_400_BAD_REQUEST)
 
-        nearby_sightings = SpotBirdSighting.objects.filter(
+        nearby_sightings = optimize_for_serializer(SpotBirdSighting.objects, SpotBirdSightingSerializer()).filter(
             spot__latitude__range=(
                 last_activity.latitude - 0.1,
                 last_activity.latitude + 0.1
@@ -430,7 +882,7 @@ class NearbyBirdActivityView(APIView):
         serializer = SpotBirdSightingSerializer(nearby_sightings, many=True)
         return Response(serializer.data)
 
-class NearbyBirdActivitySearchView(generics.ListAPIView):
+class NearbyBirdActivitySearchView(SparseFieldsetMixin, CompiledListMixin, OptimizedQuerysetMixin, generics.ListAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = SpotBirdSightingSerializer
@@ -457,7 +909,7 @@ class NearbyBirdActivitySearchView(generics.ListAPIView):
             bird__name__icontains=query
         )
 
-class NearbyBirdActivityViewAllView(generics.ListAPIView):
+class NearbyBirdActivityViewAllView(SparseFieldsetMixin, CompiledListMixin, OptimizedQuerysetMixin, generics.ListAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = SpotBirdSightingSerializer
@@ -541,7 +993,7 @@ class BirdBrainChatView(APIView):
         serializer = AIChatSerializer(chat)
         return Response(serializer.data)
 
-class BirdCategoriesView(generics.ListAPIView):
+class BirdCategoriesView(ConditionalGetMixin, generics.ListAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = BirdCategorySerializer
@@ -549,8 +1001,8 @@ class BirdCategoriesView(generics.ListAPIView):
     def get_queryset(self):
         user_collection = UserCollection.objects.filter(user=self.request.user)
         return BirdCategory.objects.filter(
-            birdcategoryassignment__bird__in=user_collection.values('bird')
-        ).distinct()
+            bird_assignments__bird__in=user_collection.values('bird')
+        ).distinct().order_by('name')
 
 class RarityHighlightsView(APIView):
     authentication_classes = [JWTAuthentication]
@@ -598,16 +1050,15 @@ class RarityHighlightsView(APIView):
             return "Uncommon find with moderate conservation value"
         return "Common find with typical conservation status"
 
-class CollectionSearchView(generics.ListAPIView):
+class CollectionSearchView(OptimizedQuerysetMixin, generics.ListAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = UserCollectionSerializer
 
     def get_queryset(self):
         query = self.request.query_params.get('query', '')
-        return UserCollection.objects.filter(
-            user=self.request.user,
-            bird__name__icontains=query
+        return bird_search.search(
+            UserCollection.objects.filter(user=self.request.user), query, ('bird__name',)
         )
 
 class CollectionFiltersView(APIView):
@@ -625,7 +1076,7 @@ class CollectionFiltersView(APIView):
             "season_filters": season_filters
         })
 
-class CollectionGetAllView(generics.ListAPIView):
+class CollectionGetAllView(OptimizedQuerysetMixin, generics.ListAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = UserCollectionSerializer
@@ -633,7 +1084,7 @@ class CollectionGetAllView(generics.ListAPIView):
     def get_queryset(self):
         return UserCollection.objects.filter(user=self.request.user)
 
-class CollectionDetailsView(generics.RetrieveAPIView):
+class CollectionDetailsView(OptimizedQuerysetMixin, generics.RetrieveAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = UserCollectionSerializer
@@ -672,7 +1123,7 @@ class CollectionFavoriteView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-class CollectionFavoritesView(generics.ListAPIView):
+class CollectionFavoritesView(OptimizedQuerysetMixin, generics.ListAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = UserCollectionSerializer
@@ -720,7 +1171,7 @@ class BookmarkView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
 
-class BookmarkedArticlesView(generics.ListAPIView):
+class BookmarkedArticlesView(OptimizedQuerysetMixin, generics.ListAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = UserBookmarkSerializer
@@ -728,7 +1179,7 @@ class BookmarkedArticlesView(generics.ListAPIView):
     def get_queryset(self):
         return UserBookmark.objects.filter(user=self.request.user)
 
-class DiscoveryLearnView(generics.ListAPIView):
+class DiscoveryLearnView(ConditionalGetMixin, generics.ListAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = ArticleSerializer
@@ -740,7 +1191,7 @@ class DiscoveryLearnView(generics.ListAPIView):
             queryset = queryset.filter(category=filter_type)
         return queryset.order_by('-published_date')
 
-class ArticleDetailsView(generics.RetrieveAPIView):
+class ArticleDetailsView(ConditionalGetMixin, generics.RetrieveAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = ArticleSerializer
@@ -760,7 +1211,19 @@ class ArticleDetailsView(generics.RetrieveAPIView):
 
         return Response(data)
 
-class ExploreView(generics.ListAPIView):
+    def get_etag_parts(self):
+        is_bookmarked = UserBookmark.objects.filter(
+            user=self.request.user,
+            article_id=self.kwargs['id']
+        ).exists()
+        return (self.request.user.pk, is_bookmarked)
+
+    def get_validators(self):
+        # No Last-Modified: bookmarking doesn't change the article's updated_at
+        etag, last_modified = super().get_validators()
+        return etag, None
+
+class ExploreView(ConditionalGetMixin, generics.ListAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = ArticleSerializer
@@ -770,7 +1233,7 @@ class ExploreView(generics.ListAPIView):
             category__in=['Migration', 'Feeder Birds']
         ).order_by('-published_date')
 
-class BirdSearchView(generics.ListAPIView):
+class BirdSearchView(CompiledListMixin, generics.ListAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = BirdListSerializer
@@ -782,21 +1245,16 @@ class BirdSearchView(generics.ListAPIView):
 
         queryset = Bird.objects.all()
 
-        if query:
-            queryset = queryset.filter(
-                Q(name__icontains=query) |
-                Q(scientific_name__icontains=query)
-            )
-
         if filter_type and filter_value:
             if filter_type.lower() == 'rarity':
                 queryset = queryset.filter(rarity__iexact=filter_value)
             elif filter_type.lower() == 'region':
-                queryset = queryset.filter(global_distribution__icontains=filter_value)
+                queryset = bird_search.search_text(queryset, 'global_distribution', filter_value)
 
-        return queryset
+        # Ranked best match first
+        return bird_search.search(queryset, query, bird_search.BIRD_FIELDS)
 
-class CommonFeederBirdsView(generics.ListAPIView):
+class CommonFeederBirdsView(CompiledListMixin, generics.ListAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = BirdListSerializer
@@ -806,7 +1264,7 @@ class CommonFeederBirdsView(generics.ListAPIView):
             behavior__icontains='feeder'
         ).order_by('name')
 
-class BirdsByCategoryView(generics.ListAPIView):
+class BirdsByCategoryView(ConditionalGetMixin, CompiledListMixin, generics.ListAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = BirdListSerializer
@@ -817,7 +1275,7 @@ class BirdsByCategoryView(generics.ListAPIView):
             return Bird.objects.none()
 
         return Bird.objects.filter(
-            birdcategoryassignment__category__name=category
+            category_assignments__category__name=category
         ).order_by('name')
 
 class NearbySpotsView(generics.ListAPIView):
@@ -845,7 +1303,7 @@ class NearbySpotsView(generics.ListAPIView):
             longitude__range=lon_range
         )
 
-class NearbyBirdListView(generics.ListAPIView):
+class NearbyBirdListView(SparseFieldsetMixin, CompiledListMixin, OptimizedQuerysetMixin, generics.ListAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = SpotBirdSightingSerializer
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.9 on 2026-10-18 12:00
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collection', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='birdcategory',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.9 on 2026-10-18 23:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('collection', '0002_birdcategory_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='usercollection',
+            index=models.Index(condition=models.Q(('is_favorite', True)), fields=['user', 'date_added'], name='collection_user_favorite_idx'),
+        ),
+    ]
@@ -27,6 +27,7 @@ class BirdCategory(models.Model):
     description = models.TextField()
     image_url = models.URLField(max_length=500)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         app_label = 'collection'
@@ -82,6 +83,10 @@ class UserCollection(models.Model):
     class Meta:
         unique_together = ('user', 'bird')
         ordering = ['-date_added']
+        indexes = [
+            # A user's favorites, newest first; only favorited rows are indexed
+            models.Index(fields=['user', 'date_added'], condition=models.Q(is_favorite=True), name='collection_user_favorite_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username}'s collection of {self.bird.name}"
@@ -17,13 +17,15 @@ from .serializers import (
 )
 from recent_activity.serializers import RecentActivitySerializer
 from .services import CollectionService
-from django.db.models import Count, Q
+from django.db.models import Count
 from core.permissions import IsOwnerOrReadOnly, IsOwner
 from rest_framework.generics import ListAPIView, CreateAPIView, RetrieveAPIView, UpdateAPIView, DestroyAPIView
 from rest_framework.exceptions import ValidationError
 from django.utils import timezone
 from datetime import timedelta
-from core.views import BaseAPIView
+from birds import search as bird_search
+from core.querysets import optimize_for_serializer
+from core.views import BaseAPIView, CompiledListMixin, ConditionalGetMixin, OptimizedQuerysetMixin, SparseFieldsetMixin
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
@@ -80,10 +82,10 @@ class BraggingRightsView(APIView):
         serializer = BraggingRightsSerializer(rights)
         return Response(serializer.data)
 
-class BirdCategoriesView(generics.ListAPIView):
+class BirdCategoriesView(ConditionalGetMixin, generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = BirdCategorySerializer
-    queryset = BirdCategory.objects.all()
+    queryset = BirdCategory.objects.order_by('name')
 
 class RarityHighlightsView(APIView):
     permission_classes = [IsAuthenticated]
@@ -105,7 +107,9 @@ class CollectionSearchView(APIView):
                 request.user,
                 serializer.validated_data
             )
-            result_serializer = CollectionSerializer(collections, many=True)
+            result_serializer = CollectionSerializer(
+                optimize_for_serializer(collections, CollectionSerializer()), many=True
+            )
             return Response(result_serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -121,7 +125,9 @@ class CollectionFilterView(APIView):
                 serializer.validated_data['filter_type'],
                 serializer.validated_data['filter_value']
             )
-            result_serializer = CollectionSerializer(collections, many=True)
+            result_serializer = CollectionSerializer(
+                optimize_for_serializer(collections, CollectionSerializer()), many=True
+            )
             return Response(result_serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -189,7 +195,7 @@ class CollectionListView(BaseAPIView):
         except Exception as e:
             raise ValidationError(str(e))
 
-class CollectionDetailView(generics.RetrieveAPIView):
+class CollectionDetailView(OptimizedQuerysetMixin, generics.RetrieveAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = CollectionSerializer
 
@@ -217,7 +223,7 @@ class FavoriteCollectionView(APIView):
             'status': 'favorited' if collection.is_favorite else 'unfavorited'
         })
 
-class FavoriteCollectionsView(generics.ListAPIView):
+class FavoriteCollectionsView(OptimizedQuerysetMixin, generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = CollectionSerializer
 
@@ -303,20 +309,19 @@ class UserBraggingRightsView(APIView):
             return "Top 25%"
         return "Top 50%"
 
-class CollectionSearchView(generics.ListAPIView):
+class CollectionSearchView(SparseFieldsetMixin, CompiledListMixin, OptimizedQuerysetMixin, generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = UserCollectionSerializer
 
     def get_queryset(self):
         query = self.request.query_params.get('q', '')
-        return UserCollection.objects.filter(
-            Q(user=self.request.user) &
-            (Q(bird__name__icontains=query) |
-             Q(bird__scientific_name__icontains=query) |
-             Q(notes__icontains=query))
+        return bird_search.search(
+            UserCollection.objects.filter(user=self.request.user),
+            query,
+            ('bird__name', 'bird__scientific_name', 'notes')
         )
 
-class CollectionFiltersView(generics.ListAPIView):
+class CollectionFiltersView(SparseFieldsetMixin, CompiledListMixin, OptimizedQuerysetMixin, generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = UserCollectionSerializer
 
@@ -343,14 +348,14 @@ class CollectionFiltersView(generics.ListAPIView):
 
         return queryset
 
-class CollectionGetAllView(generics.ListAPIView):
+class CollectionGetAllView(SparseFieldsetMixin, CompiledListMixin, OptimizedQuerysetMixin, generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = UserCollectionSerializer
 
     def get_queryset(self):
         return UserCollection.objects.filter(user=self.request.user)
 
-class CollectionDetailsView(generics.RetrieveAPIView):
+class CollectionDetailsView(SparseFieldsetMixin, OptimizedQuerysetMixin, generics.RetrieveAPIView):
     permission_classes = [IsAuthenticated, IsOwner]
     serializer_class = UserCollectionSerializer
     lookup_field = 'id'
@@ -379,7 +384,7 @@ class CollectionFavoriteView(APIView):
                 'error': 'Collection not found'
             }, status=404)
 
-class CollectionFavoritesView(generics.ListAPIView):
+class CollectionFavoritesView(SparseFieldsetMixin, CompiledListMixin, OptimizedQuerysetMixin, generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = UserCollectionSerializer
 
@@ -417,14 +422,14 @@ class UserCollectionCreateView(CreateAPIView):
         except Exception as e:
             raise ValidationError(str(e))
 
-class UserCollectionDetailView(RetrieveAPIView):
+class UserCollectionDetailView(SparseFieldsetMixin, OptimizedQuerysetMixin, RetrieveAPIView):
     serializer_class = UserCollectionSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         return UserCollection.objects.filter(user=self.request.user)
 
-class UserCollectionUpdateView(UpdateAPIView):
+class UserCollectionUpdateView(OptimizedQuerysetMixin, UpdateAPIView):
     serializer_class = UserCollectionSerializer
     permission_classes = [IsAuthenticated]
 
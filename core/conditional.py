@@ -0,0 +1,38 @@
+"""
+Conditional GET for catalog and content endpoints.
+
+Validators are worked out from the rows a response is built from rather
+than from its rendered body, so a client coming back with If-None-Match or
+If-Modified-Since gets its 304 for the price of one aggregate query and no
+serialization:
+
+    ETag           hash of MAX(updated_at) and COUNT(*) over the view's
+                   queryset, the path with its query string and the media
+                   type, plus anything the view adds in get_etag_parts()
+    Last-Modified  MAX(updated_at), on detail views only
+
+Lists only get an ETag: deleting a row lowers the count but not
+MAX(updated_at), so a date alone cannot tell a client its page is stale.
+Clients that send both headers are judged on If-None-Match alone.
+
+Views whose body depends on more than their own rows (nested relations,
+per-user flags) add that state through get_etag_parts(); see
+ConditionalGetMixin in core/views.py.
+"""
+import hashlib
+from calendar import timegm
+
+from django.db.models import Count, Max
+from django.utils.http import quote_etag
+
+def queryset_state(queryset, field='updated_at'):
+    """(MAX(field), COUNT(*)) over queryset, in one query"""
+    state = queryset.order_by().aggregate(last_modified=Max(field), count=Count('pk'))
+    return state['last_modified'], state['count']
+
+def make_etag(*parts):
+    return quote_etag(hashlib.md5(repr(parts).encode()).hexdigest())
+
+def timestamp(value):
+    """Seconds since the epoch for a datetime, as get_conditional_response() expects"""
+    return timegm(value.utctimetuple()) if value is not None else None
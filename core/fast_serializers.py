@@ -0,0 +1,166 @@
+"""
+Compiled read-only serializers for large list responses.
+
+compile_serializer() turns a ModelSerializer class into a CompiledSerializer
+that reads rows with a single .values() query (forward relations joined in)
+plus one .values() query per nested many=True relation, and renders each row
+with a generated function instead of walking DRF fields. The output renders
+to the same JSON as serializer_class(queryset, many=True).data.
+
+Supported fields are model fields, primary-key related fields, nested
+serializers on forward foreign keys / one-to-ones and nested many=True
+serializers on reverse foreign keys. A SerializerMethodField is only
+supported when the serializer maps it to values lookups:
+
+    class SimilarBirdSerializer(serializers.ModelSerializer):
+        fast_method_fields = {
+            'similar_to_details': {'id': 'similar_to__id', 'name': 'similar_to__name'},
+        }
+
+Anything else raises ImproperlyConfigured when the serializer is compiled.
+"""
+import itertools
+from collections import defaultdict
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models import F
+from rest_framework import serializers
+
+from .fieldsets import prune
+
+# Fields whose to_representation() returns database values unchanged
+IDENTITY_FIELDS = (serializers.CharField, serializers.IntegerField, serializers.BooleanField)
+LINK = '_fast_link'
+
+class CompiledSerializer:
+    def __init__(self, serializer):
+        if isinstance(serializer, serializers.ListSerializer):
+            serializer = serializer.child
+        self.name = type(serializer).__name__
+        self.model = serializer.Meta.model
+        self.lookups = []
+        self.children = []
+        self._positions = {}
+        self._counter = itertools.count()
+        self._namespace = {}
+        expression = self._compile(serializer, self.model, '')
+        source = f"def render(row, groups):\n    return {expression}\n"
+        exec(compile(source, f'<compiled {self.name}>', 'exec'), self._namespace)
+        self.source = source
+        self._render = self._namespace['render']
+
+    def _lookup(self, path):
+        if path not in self._positions:
+            self._positions[path] = len(self.lookups)
+            self.lookups.append(path)
+        return f"row[{path!r}]"
+
+    def _bind(self, value):
+        name = f"_v{next(self._counter)}"
+        self._namespace[name] = value
+        return name
+
+    def _error(self, field, reason):
+        return ImproperlyConfigured(f"Cannot compile {self.name}.{field.field_name}: {reason}")
+
+    def _compile(self, serializer, model, prefix):
+        """Dict literal rendering serializer's readable fields for one row"""
+        method_fields = getattr(serializer, 'fast_method_fields', {})
+        items = []
+        for field in serializer.fields.values():
+            if field.write_only:
+                continue
+            items.append(f"{field.field_name!r}: {self._field(field, model, prefix, method_fields)}")
+        return '{' + ', '.join(items) + '}'
+
+    def _field(self, field, model, prefix, method_fields):
+        if isinstance(field, serializers.SerializerMethodField):
+            if field.field_name not in method_fields:
+                raise self._error(field, 'method fields need a fast_method_fields mapping')
+            mapping = method_fields[field.field_name]
+            return '{' + ', '.join(f"{key!r}: {self._lookup(prefix + path)}" for key, path in mapping.items()) + '}'
+        if field.source == '*':
+            raise self._error(field, "source='*' is not supported")
+
+        # Walk dotted sources through forward relations
+        *parents, attr = field.source.split('.')
+        for name in parents:
+            model_field = self._model_field(field, model, name)
+            if not (model_field.many_to_one or model_field.one_to_one) or not model_field.concrete:
+                raise self._error(field, f"{name} is not a forward relation")
+            model, prefix = model_field.related_model, f"{prefix}{name}__"
+        model_field = self._model_field(field, model, attr)
+        path = prefix + attr
+
+        if isinstance(field, serializers.ListSerializer):
+            if not model_field.one_to_many or parents:
+                raise self._error(field, 'nested many=True serializers must be on a reverse foreign key')
+            child = CompiledSerializer(field.child)
+            child.link = model_field.field.name
+            child.parent_pk = prefix + model._meta.pk.name
+            index = len(self.children)
+            self.children.append(child)
+            return f"groups[{index}].get({self._lookup(child.parent_pk)}, [])"
+        if isinstance(field, serializers.BaseSerializer):
+            if not (model_field.many_to_one or model_field.one_to_one) or not model_field.concrete:
+                raise self._error(field, 'nested serializers must be on a forward relation')
+            related = model_field.related_model
+            nested_prefix = path + '__'
+            pk = self._lookup(nested_prefix + related._meta.pk.name)
+            return f"(None if {pk} is None else {self._compile(field, related, nested_prefix)})"
+        if model_field.is_relation:
+            if not isinstance(field, serializers.PrimaryKeyRelatedField) or field.pk_field is not None:
+                raise self._error(field, 'only primary key related fields are supported')
+            if model_field.many_to_many or model_field.one_to_many:
+                raise self._error(field, 'many-valued relations need a nested serializer')
+            return self._lookup(path)
+        if isinstance(field, IDENTITY_FIELDS):
+            return self._lookup(path)
+        if isinstance(field, serializers.FileField):
+            raise self._error(field, 'file fields need the storage to build URLs')
+        converter = self._bind(field.to_representation)
+        return f"(None if (value := {self._lookup(path)}) is None else {converter}(value))"
+
+    def _model_field(self, field, model, name):
+        try:
+            return model._meta.get_field(name)
+        except FieldDoesNotExist:
+            raise self._error(field, f"{model.__name__}.{name} is not a model field")
+
+    def values(self, queryset):
+        """values() queryset for rows; paginate or slice it like any queryset"""
+        return queryset.prefetch_related(None).values(*self.lookups)
+
+    def render(self, rows):
+        """Serialized dicts for rows from values()"""
+        rows = list(rows)
+        groups = [child.fetch(rows) for child in self.children]
+        render = self._render
+        return [render(row, groups) for row in rows]
+
+    def fetch(self, parent_rows):
+        """Rendered related rows grouped by parent primary key"""
+        ids = {row[self.parent_pk] for row in parent_rows} - {None}
+        grouped = defaultdict(list)
+        if not ids:
+            return grouped
+        rows = list(
+            self.model._default_manager.filter(**{f'{self.link}__in': ids})
+            .values(*self.lookups, **{LINK: F(self.link)})
+        )
+        for row, rendered in zip(rows, self.render(rows)):
+            grouped[row[LINK]].append(rendered)
+        return grouped
+
+    def __call__(self, queryset):
+        return self.render(self.values(queryset))
+
+# Bounded because sparse fieldsets (core/fieldsets.py) come from the query string
+@lru_cache(maxsize=256)
+def compile_serializer(serializer_class, fieldset=None):
+    """CompiledSerializer for a serializer class, optionally pruned to a fieldset, built once per process"""
+    serializer = serializer_class()
+    if fieldset is not None:
+        prune(serializer, fieldset)
+    return CompiledSerializer(serializer)
@@ -0,0 +1,71 @@
+"""
+Sparse fieldsets for read endpoints.
+
+Two query parameters trim a serializer tree before it is used:
+
+    ?fields=id,bird.name,bird.image_url,bird.rarity
+        keep only these fields; a nested field listed without children
+        keeps all of its own fields
+    ?expand=bird.images,bird.sounds
+        include relations a serializer lists in expandable_fields
+
+Relations in expandable_fields are heavy nested data that light clients
+rarely need:
+
+    class BirdSerializer(serializers.ModelSerializer):
+        expandable_fields = ['images', 'sounds', 'similar_birds']
+
+They are dropped whenever either parameter is present, unless expanded or
+named in ?fields=. Without either parameter the full representation is
+returned as before. Unknown names are ignored.
+
+Pruning happens on the serializer instance, before the view builds its
+queryset, so optimize_for_serializer() and compile_serializer() only join
+and fetch what is rendered.
+"""
+from rest_framework import serializers
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+def parse_paths(value):
+    """Nested tuple tree for 'a,b.c,b.d': (('a', ()), ('b', (('c', ()), ('d', ()))))"""
+    tree = {}
+    for path in value.split(','):
+        node = tree
+        for name in path.strip().split('.'):
+            if name:
+                node = node.setdefault(name, {})
+    return freeze(tree)
+
+def freeze(tree):
+    return tuple(sorted((name, freeze(children)) for name, children in tree.items()))
+
+def fieldset_from_request(request):
+    """(fields tree or None, expand tree) from the query string, or None when neither is given"""
+    params = request.query_params
+    if FIELDS_PARAM not in params and EXPAND_PARAM not in params:
+        return None
+    fields = parse_paths(params[FIELDS_PARAM]) if params.get(FIELDS_PARAM) else None
+    return fields, parse_paths(params.get(EXPAND_PARAM, ''))
+
+def prune(serializer, fieldset):
+    """Drop the fields fieldset does not ask for from serializer (and its nested serializers) in place"""
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    fields, expand = fieldset
+    selected = dict(fields) if fields else None
+    expanded = dict(expand)
+    expandable = getattr(serializer, 'expandable_fields', ())
+
+    for name in list(serializer.fields):
+        if selected is not None and name not in selected:
+            del serializer.fields[name]
+        elif name in expandable and name not in expanded and not (selected and name in selected):
+            del serializer.fields[name]
+        else:
+            field = serializer.fields[name]
+            if isinstance(field, serializers.BaseSerializer):
+                children = selected.get(name) if selected else None
+                prune(field, (children or None, expanded.get(name, ())))
+    return serializer
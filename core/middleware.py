@@ -0,0 +1,100 @@
+"""
+Per-request SQL instrumentation.
+
+QueryBudgetMiddleware counts the queries each request runs, their total time
+and the slowest statements. With DEBUG on they are returned as headers:
+
+    X-DB-Query-Count: 4
+    X-DB-Time-Ms: 3.2
+    X-DB-Slowest-Ms: 1.9
+
+A view may declare how many queries it is allowed:
+
+    class BirdListView(OptimizedQuerysetMixin, generics.ListAPIView):
+        query_budget = 6
+
+or a budget can be set in settings.QUERY_BUDGETS, keyed by URL name
+('birds:bird_list') or view class name. Requests over budget are logged as
+warnings on the 'core.queries' logger together with the slowest statements.
+Queries run while a streaming response is consumed are not counted.
+"""
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('core.queries')
+
+class QueryRecorder:
+    """Database execute wrapper collecting count, total time and the slowest statements"""
+
+    def __init__(self, keep=3):
+        self.keep = keep
+        self.count = 0
+        self.total = 0.0
+        self.slowest = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.count += 1
+            self.total += duration
+            if len(self.slowest) < self.keep or duration > self.slowest[-1][0]:
+                self.slowest.append((duration, sql))
+                self.slowest.sort(key=lambda item: item[0], reverse=True)
+                del self.slowest[self.keep:]
+
+    def record(self):
+        """Context manager installing the recorder on every configured database"""
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(self))
+        return stack
+
+def view_query_budget(view_func, view_name=None):
+    """Budget for a view: settings.QUERY_BUDGETS first, then the view's query_budget"""
+    # Django's as_view() sets view_class, DRF's also sets cls
+    view_class = getattr(view_func, 'view_class', None) or getattr(view_func, 'cls', None)
+    budgets = getattr(settings, 'QUERY_BUDGETS', {})
+    for key in (view_name, view_class.__name__ if view_class else None):
+        if key and key in budgets:
+            return budgets[key]
+    return getattr(view_class, 'query_budget', None)
+
+class QueryBudgetMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder(keep=getattr(settings, 'QUERY_BUDGET_SLOWEST', 3))
+        request.query_budget = None
+        with recorder.record():
+            response = self.get_response(request)
+
+        if settings.DEBUG:
+            response['X-DB-Query-Count'] = str(recorder.count)
+            response['X-DB-Time-Ms'] = f"{recorder.total * 1000:.1f}"
+            if recorder.slowest:
+                response['X-DB-Slowest-Ms'] = f"{recorder.slowest[0][0] * 1000:.1f}"
+
+        budget = request.query_budget
+        if budget is not None and recorder.count > budget:
+            logger.warning(
+                "%s %s ran %d queries (budget %d, %.1f ms); slowest: %s",
+                request.method,
+                request.path,
+                recorder.count,
+                budget,
+                recorder.total * 1000,
+                ' | '.join(f"{duration * 1000:.1f} ms {sql}" for duration, sql in recorder.slowest)
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        request.query_budget = view_query_budget(view_func, match.view_name if match else None)
@@ -0,0 +1,124 @@
+"""
+Keyset pagination for large per-user feeds.
+
+PageNumberPagination runs a COUNT(*) and an OFFSET scan on every page, so
+page 500 of a heavy user's feed reads 5000 rows to return 10. Keyset
+pagination remembers the (created_at, id) of the last row instead and asks
+for the rows strictly after it:
+
+    WHERE created_at <= :created_at
+      AND (created_at < :created_at OR id < :id)
+    ORDER BY created_at DESC, id DESC
+    LIMIT 11
+
+With an index ending in (created_at, id) every page is one index range
+scan, however deep. id breaks ties between rows created in the same
+instant, so no row is skipped or repeated, and rows added while a client is
+paging don't shift the pages it has not reached yet.
+
+Responses have the CursorPagination shape ({"next", "previous", "results"},
+no count). The cursor is opaque; clients follow the links.
+"""
+import json
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+KEY_ALIAS = '_keyset_{}'
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination on ordering = ('-created_at', '-id'). The fields must
+    together be unique and all sorted the same way; back the view's filter
+    plus these fields with an index.
+    """
+    ordering = ('-created_at', '-id')
+    page_size = 10
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor.reverse if self.cursor else False
+        position = self.decode_position(self.cursor.position) if self.cursor else None
+
+        fields = [order.lstrip('-') for order in self.ordering]
+        descending = self.ordering[0].startswith('-')
+        # Annotated so the key can be read back from values() rows as well as instances
+        queryset = queryset.annotate(**{KEY_ALIAS.format(i): F(field) for i, field in enumerate(fields)})
+        if reverse:
+            queryset = queryset.order_by(*[('' if descending else '-') + field for field in fields])
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if position is not None:
+            try:
+                queryset = queryset.filter(self.after(fields, position, descending != reverse))
+            except (DjangoValidationError, TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_following = len(results) > len(self.page)
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = position is not None, has_following
+        else:
+            self.has_next, self.has_previous = has_following, position is not None
+
+        if self.page:
+            self.previous_position = self.key(self.page[0], len(fields))
+            self.next_position = self.key(self.page[-1], len(fields))
+        else:
+            self.has_next = self.has_previous = False
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        # Fixed: ?ordering= (OrderingFilter) would break the keyset
+        return tuple(self.ordering)
+
+    def after(self, fields, position, descending):
+        """Rows past position in the given direction, led by a range on the first field so it uses the index"""
+        op = 'lt' if descending else 'gt'
+        condition = Q()
+        for i, field in enumerate(fields):
+            condition |= Q(**dict(zip(fields[:i], position)), **{f'{field}__{op}': position[i]})
+        return Q(**{f'{fields[0]}__{op}e': position[0]}) & condition
+
+    def key(self, row, size):
+        names = [KEY_ALIAS.format(i) for i in range(size)]
+        if isinstance(row, dict):
+            values = [row[name] for name in names]
+        else:
+            values = [getattr(row, name) for name in names]
+        return json.dumps([value.isoformat() if hasattr(value, 'isoformat') else value for value in values])
+
+    def decode_position(self, position):
+        if position is None:
+            return None
+        try:
+            values = json.loads(position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=self.next_position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=self.previous_position))
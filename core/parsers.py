@@ -0,0 +1,24 @@
+"""
+JSON parser backed by orjson, with DRF's JSONParser as the fallback when
+orjson is not installed. Like the strict stdlib parser it rejects NaN and
+Infinity; bodies in a charset other than UTF-8 are decoded first.
+"""
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from .renderers import FastJSONRenderer, orjson
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        encoding = (parser_context or {}).get('encoding') or 'utf-8'
+        body = stream.read() if stream is not None else b''
+        try:
+            if encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+                body = body.decode(encoding)
+            return orjson.loads(body)
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
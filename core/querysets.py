@@ -0,0 +1,99 @@
+"""
+Serializer-aware queryset optimization.
+
+optimize_for_serializer() walks a serializer's fields and adds the
+select_related/prefetch_related calls needed to render it without per-row
+queries:
+
+- nested serializers on forward foreign keys / one-to-ones are joined with
+  select_related
+- nested serializers on reverse or many-to-many relations (many=True) are
+  prefetched, and everything below them is prefetched too
+- relations only a SerializerMethodField (or other custom code) touches
+  cannot be discovered, so serializers declare them:
+
+    class SimilarBirdSerializer(serializers.ModelSerializer):
+        select_related_fields = {'similar_to_details': ['similar_to']}
+
+  as a list, or as a dict keyed by the field that needs them so they are
+  skipped when that field is pruned (core/fieldsets.py). Paths are relative
+  to the serializer's model and are prefixed with the source path when the
+  serializer is nested.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import QuerySet
+from rest_framework import serializers
+
+def _relation(model, name):
+    """(related model, is_many) for a relation field name on model, or None"""
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+    if not field.is_relation or field.related_model is None:
+        return None
+    return field.related_model, bool(field.many_to_many or field.one_to_many)
+
+def collect_relations(serializer, prefix='', in_prefetch=False, select=None, prefetch=None):
+    """Sets of select_related and prefetch_related lookups needed to render serializer"""
+    select = set() if select is None else select
+    prefetch = set() if prefetch is None else prefetch
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    model = getattr(getattr(serializer, 'Meta', None), 'model', None)
+    if model is None:
+        return select, prefetch
+
+    def add(path, many):
+        if many or in_prefetch:
+            prefetch.add(path)
+        else:
+            select.add(path)
+
+    for attr, many in (('select_related_fields', False), ('prefetch_related_fields', True)):
+        declared = getattr(serializer, attr, ())
+        if isinstance(declared, dict):
+            # Keyed by the field that reads them, so fields pruned by ?fields= fetch nothing
+            declared = [path for name, paths in declared.items() if name in serializer.fields for path in paths]
+        for path in declared:
+            add(prefix + path, many)
+
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*':
+            continue
+        # Primary-key and hyperlinked fields read the *_id column, so only other related fields need the join
+        nested = isinstance(field, (serializers.BaseSerializer, serializers.ManyRelatedField)) or (
+            isinstance(field, serializers.RelatedField)
+            and not isinstance(field, (serializers.PrimaryKeyRelatedField, serializers.HyperlinkedRelatedField))
+        )
+        if not nested:
+            continue
+
+        # Follow dotted sources (e.g. source='bird.family') relation by relation
+        current, path, many = model, prefix, in_prefetch
+        for attr in field.source.split('.'):
+            relation = _relation(current, attr)
+            if relation is None:
+                current = None
+                break
+            current, is_many = relation
+            path += attr
+            add(path, is_many or many)
+            many = many or is_many
+            path += '__'
+        if current is None:
+            continue
+        if isinstance(field, serializers.BaseSerializer):
+            collect_relations(field, path, many, select, prefetch)
+    return select, prefetch
+
+def optimize_for_serializer(queryset, serializer):
+    """Apply the serializer's joins and prefetches; anything that is not a QuerySet is returned untouched"""
+    if not isinstance(queryset, QuerySet):
+        return queryset
+    select, prefetch = collect_relations(serializer)
+    if select:
+        queryset = queryset.select_related(*sorted(select))
+    if prefetch:
+        queryset = queryset.prefetch_related(*sorted(prefetch))
+    return queryset
@@ -0,0 +1,43 @@
+"""
+JSON renderer backed by orjson.
+
+Produces the same JSON as DRF's JSONRenderer with the default settings
+(compact, UTF-8, U+2028/U+2029 escaped), except that very large or small
+floats use orjson's exponent form (1e16 rather than 1e+16) and NaN/Infinity
+are written as null instead of raising. Values orjson does not handle
+natively go through DRF's JSONEncoder.default, so lazy translation strings,
+Decimals, timedeltas, querysets and numpy values are encoded the same way,
+and datetimes keep DRF's millisecond precision and 'Z' suffix.
+
+Indented output (Accept: application/json; indent=4) and anything orjson
+rejects, such as integers wider than 64 bits, fall back to the stdlib
+renderer, as does everything when orjson is not installed.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    # Datetimes are passed to JSONEncoder.default to keep DRF's formatting
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+_encoder = JSONEncoder()
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_encoder.default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same escaping as JSONRenderer, which keeps the output valid JavaScript
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
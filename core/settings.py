@@ -14,11 +14,6 @@ from pathlib import Path
 import os
 from datetime import timedelta
 from dotenv import load_dotenv
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-from rest_framework import permissions
-from drf_yasg.renderers import OpenAPIRenderer, SwaggerUIRenderer
-from rest_framework import renderers
 
 # Load environment variables
 load_dotenv()
@@ -80,6 +75,7 @@ INSTALLED_APPS = [
 SITE_ID = 1
 
 MIDDLEWARE = [
+    'core.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -185,20 +181,21 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # REST Framework settings
+# Only the JSON renderer and parser are configured. The permission,
+# authentication, pagination, filter and exception handler defaults that
+# used to be listed here never applied (DRF read its settings before this
+# module had finished loading), so the API runs on DRF's own defaults.
+# Switching those on changes the shape and access rules of most endpoints
+# and needs its own change.
 REST_FRAMEWORK = {
-    'DEFAULT_PERMISSION_CLASSES': [
-        'rest_framework.permissions.IsAuthenticated',
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ],
-    'EXCEPTION_HANDLER': 'core.utils.custom_exception_handler',
-    'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 10,
-    'DEFAULT_FILTER_BACKENDS': [
-        'django_filters.rest_framework.DjangoFilterBackend',
-        'rest_framework.filters.SearchFilter',
-        'rest_framework.filters.OrderingFilter',
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
 }
 
@@ -220,6 +217,61 @@ CORS_ALLOWED_ORIGINS = [
 GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY')
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 
+# OpenAI settings
+OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+
+# Sound identification (local BirdNET, optional Whisper/GPT-4 fallback)
+BIRDNET_TOP_K = int(os.getenv('BIRDNET_TOP_K', 5))
+BIRDNET_MIN_CONFIDENCE = float(os.getenv('BIRDNET_MIN_CONFIDENCE', 0.1))
+BIRD_SOUND_LLM_FALLBACK = os.getenv('BIRD_SOUND_LLM_FALLBACK', 'False') == 'True'
+BIRDNET_BATCH_MAX_FILES = int(os.getenv('BIRDNET_BATCH_MAX_FILES', 200))
+BIRDNET_BATCH_MAX_ARCHIVE_BYTES = int(os.getenv('BIRDNET_BATCH_MAX_ARCHIVE_BYTES', 2 * 1024 ** 3))
+BIRDNET_BATCH_INSERT_SIZE = int(os.getenv('BIRDNET_BATCH_INSERT_SIZE', 50))
+
+# Streaming sound identification over WebSocket (see birds/streaming.py)
+BIRDNET_STREAM_HOP_SECONDS = float(os.getenv('BIRDNET_STREAM_HOP_SECONDS', 1.0))
+BIRDNET_STREAM_SENSITIVITY = float(os.getenv('BIRDNET_STREAM_SENSITIVITY', 1.0))
+BIRDNET_STREAM_MAX_SESSIONS = int(os.getenv('BIRDNET_STREAM_MAX_SESSIONS', 50))
+BIRDNET_STREAM_MAX_CONCURRENT_INFERENCES = int(
+    os.getenv('BIRDNET_STREAM_MAX_CONCURRENT_INFERENCES', max(1, (os.cpu_count() or 2) - 1))
+)
+
+# Sonogram rendering (see birds/sonogram.py)
+SONOGRAM_MAX_WIDTH = int(os.getenv('SONOGRAM_MAX_WIDTH', 1200))
+SONOGRAM_PEAKS = int(os.getenv('SONOGRAM_PEAKS', 800))
+SONOGRAM_METADATA_MAX_AGE = int(os.getenv('SONOGRAM_METADATA_MAX_AGE', 86400))
+
+# Cache: Redis when REDIS_URL is set, otherwise per-process memory
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+            'OPTIONS': {'CLIENT_CLASS': 'django_redis.client.DefaultClient'},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Rendered bird detail cache (see birds/cache.py), used only when CACHES is shared by every worker
+BIRD_DETAIL_CACHE_TIMEOUT = int(os.getenv('BIRD_DETAIL_CACHE_TIMEOUT', 86400))
+BIRD_DETAIL_CACHE_LOCK_TIMEOUT = float(os.getenv('BIRD_DETAIL_CACHE_LOCK_TIMEOUT', 5))
+
+# Bird catalog search (see birds/search.py). The backend is picked from the
+# database unless a dotted path is given.
+BIRD_SEARCH_BACKEND = os.getenv('BIRD_SEARCH_BACKEND', '')
+BIRD_SEARCH_THRESHOLD = float(os.getenv('BIRD_SEARCH_THRESHOLD', 0.5))
+BIRD_SEARCH_MAX_RESULTS = int(os.getenv('BIRD_SEARCH_MAX_RESULTS', 500))
+
+# SQL query instrumentation (see core/middleware.py). Budgets are keyed by URL
+# name ('birds:bird_list') or view class name and override a view's query_budget.
+QUERY_BUDGETS = {}
+QUERY_BUDGET_SLOWEST = int(os.getenv('QUERY_BUDGET_SLOWEST', 3))
+
 # Stripe settings
 STRIPE_PUBLIC_KEY = os.getenv('STRIPE_PUBLIC_KEY')
 STRIPE_SECRET_KEY = os.getenv('STRIPE_SECRET_KEY')
@@ -244,20 +296,6 @@ CELERY_TIMEZONE = TIME_ZONE
 # Custom User Model
 AUTH_USER_MODEL = 'authentication.User'
 
-# Swagger/OpenAPI Documentation
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Bird Detection API",
-        default_version='v1',
-        description="API documentation for Bird Detection application",
-        terms_of_service="https://www.google.com/policies/terms/",
-        contact=openapi.Contact(email="contact@birddetection.com"),
-        license=openapi.License(name="BSD License"),
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
-
 # Authentication backends
 AUTHENTICATION_BACKENDS = [
     'authentication.backends.EmailBackend',
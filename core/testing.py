@@ -0,0 +1,108 @@
+"""
+Test helpers for query budgets (see core/middleware.py).
+
+    class BirdListBudgetTest(QueryBudgetTestMixin, APITestCase):
+        def setUp(self):
+            self.user = seed_query_budget_data(rows=20)
+
+        def test_bird_list(self):
+            self.assertWithinQueryBudget(reverse('birds:bird_list'), user=self.user)
+
+Seed enough rows that an N+1 shows up as a budget failure rather than
+hiding under a small constant. budgeted_url_names() lists the routed views
+with a budget, so each app's tests can check they cover all of its own.
+"""
+import datetime
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, resolve
+
+from .middleware import view_query_budget
+
+def format_queries(captured):
+    return '\n'.join(f"{i}. {query['sql']}" for i, query in enumerate(captured, start=1))
+
+@contextmanager
+def assert_max_queries(budget, using=DEFAULT_DB_ALIAS):
+    """Fail if the block runs more than budget queries, listing every query it ran"""
+    with CaptureQueriesContext(connections[using]) as context:
+        yield context
+    if len(context) > budget:
+        raise AssertionError(
+            f"{len(context)} queries executed, budget is {budget}:\n{format_queries(context.captured_queries)}"
+        )
+
+class QueryBudgetTestMixin:
+    """For APITestCase: checks an endpoint against its declared or an explicit budget"""
+
+    def assertWithinQueryBudget(self, path, user=None, budget=None, method='get', data=None, **extra):
+        if budget is None:
+            match = resolve(urlsplit(path).path)
+            budget = view_query_budget(match.func, match.view_name)
+        if budget is None:
+            self.fail(f"No query budget declared for {path}")
+        if user is not None:
+            self.client.force_authenticate(user=user)
+        with assert_max_queries(budget):
+            response = getattr(self.client, method)(path, data, **extra)
+        self.assertLess(response.status_code, 400, getattr(response, 'data', response.content))
+        return response
+
+def budgeted_url_names(namespace, patterns=None, prefix=''):
+    """URL names ('birds:bird_list') of the routed views in namespace that have a query budget"""
+    names = set()
+    for pattern in get_resolver().url_patterns if patterns is None else patterns:
+        if isinstance(pattern, URLResolver):
+            names |= budgeted_url_names(
+                namespace, pattern.url_patterns, f"{prefix}{pattern.namespace}:" if pattern.namespace else prefix
+            )
+        elif isinstance(pattern, URLPattern) and pattern.name and prefix == f"{namespace}:":
+            name = prefix + pattern.name
+            if view_query_budget(pattern.callback, name) is not None:
+                names.add(name)
+    return names
+
+def seed_query_budget_data(rows=20, user=None):
+    """A user with rows birds in their activity, collection and nearby sightings; returns the user"""
+    from birds.models import Bird
+    from collection.models import UserCollection
+    from nearby.models import NearbySpot, SpotBirdSighting
+    from recent_activity.models import UserActivity
+
+    if user is None:
+        user = get_user_model().objects.create_user(
+            email='budget@example.com', username='budget', password='budget-password'
+        )
+    spot = NearbySpot.objects.create(
+        name='Budget Marsh', description='Seeded spot', latitude=51.5, longitude=-0.1,
+        created_by=user, is_verified=True
+    )
+    birds = Bird.objects.bulk_create(
+        Bird(
+            name=f"Seeded Bird {i}",
+            scientific_name=f"Avis seeded{i}",
+            description='Seeded for query budget tests',
+            image_url='https://example.com/bird.jpg',
+            rarity='C',
+            conservation_status='LC'
+        )
+        for i in range(rows)
+    )
+    today = datetime.date.today()
+    UserActivity.objects.bulk_create(
+        UserActivity(
+            user=user, bird=bird, activity_type='identification', description='Seeded',
+            latitude=spot.latitude, longitude=spot.longitude, location_name=spot.name
+        )
+        for bird in birds
+    )
+    UserCollection.objects.bulk_create(UserCollection(user=user, bird=bird) for bird in birds)
+    SpotBirdSighting.objects.bulk_create(
+        SpotBirdSighting(spot=spot, bird=bird, sighting_date=today, reported_by=user, is_verified=True)
+        for bird in birds
+    )
+    return user
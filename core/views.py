@@ -4,7 +4,14 @@ from rest_framework import status
 from django.core.exceptions import ObjectDoesNotExist
 from rest_framework.exceptions import ValidationError
 from django.db import IntegrityError
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, SAFE_METHODS
+from django.db.models import QuerySet
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from .conditional import make_etag, queryset_state, timestamp
+from .fast_serializers import compile_serializer
+from .fieldsets import fieldset_from_request, prune
+from .querysets import optimize_for_serializer
 
 class BaseAPIView(APIView):
     """
@@ -54,4 +61,103 @@ class BaseAPIView(APIView):
         """
         missing_fields = [field for field in required_fields if field not in data]
         if missing_fields:
-            raise ValidationError(f"Missing required fields: {', '.join(missing_fields)}")
\ No newline at end of file
+            raise ValidationError(f"Missing required fields: {', '.join(missing_fields)}")
+
+class OptimizedQuerysetMixin:
+    """
+    Adds the select_related/prefetch_related calls the view's serializer
+    needs (see core/querysets.py) to list and detail querysets
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        return optimize_for_serializer(queryset, self.get_serializer())
+
+class CompiledListMixin:
+    """
+    Renders list responses with the compiled form of the view's serializer
+    (see core/fast_serializers.py). Views whose get_queryset returns a plain
+    list fall back to the normal serializer.
+    """
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        if not isinstance(queryset, QuerySet):
+            return super().list(request, *args, **kwargs)
+        compiled = self.get_compiled_serializer()
+        rows = compiled.values(queryset)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(compiled.render(page))
+        return Response(compiled.render(rows))
+
+    def get_compiled_serializer(self):
+        return compile_serializer(self.get_serializer_class())
+
+class SparseFieldsetMixin:
+    """
+    ?fields= and ?expand= on read requests (see core/fieldsets.py). List it
+    before CompiledListMixin so the compiled serializer is pruned too.
+    """
+
+    def get_fieldset(self):
+        request = getattr(self, 'request', None)
+        if request is None or request.method not in SAFE_METHODS:
+            return None
+        return fieldset_from_request(request)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        fieldset = self.get_fieldset()
+        if fieldset is not None:
+            prune(serializer, fieldset)
+        return serializer
+
+    def get_compiled_serializer(self):
+        return compile_serializer(self.get_serializer_class(), self.get_fieldset())
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified validators on GET and HEAD (see core/conditional.py).
+    A request whose If-None-Match or If-Modified-Since still matches gets a
+    304 before the queryset is fetched or serialized. List it first so its
+    get() wraps the view's.
+    """
+    last_modified_field = 'updated_at'
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators()
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        if etag:
+            response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def is_detail(self):
+        return (self.lookup_url_kwarg or self.lookup_field) in self.kwargs
+
+    def get_validator_queryset(self):
+        if self.is_detail():
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            return self.get_queryset().filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return self.filter_queryset(self.get_queryset())
+
+    def get_etag_parts(self):
+        """State the response depends on besides its own rows"""
+        return ()
+
+    def get_validators(self):
+        """(etag, last_modified timestamp) for this request; (None, None) skips the check"""
+        last_modified, count = queryset_state(self.get_validator_queryset(), self.last_modified_field)
+        detail = self.is_detail()
+        if detail and not count:
+            # Let the view raise its 404
+            return None, None
+        etag = make_etag(
+            self.request.get_full_path(), self.request.accepted_media_type,
+            last_modified, count, *self.get_etag_parts()
+        )
+        return etag, timestamp(last_modified) if detail else None
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.9 on 2026-10-19 00:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('discover', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['category', '-created_at'], name='discover_article_category_idx'),
+        ),
+    ]
@@ -16,6 +16,10 @@ class Article(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Discovery feed: one category, newest first
+            models.Index(fields=['category', '-created_at'], name='discover_article_category_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -11,6 +11,7 @@ from rest_framework.generics import ListAPIView, CreateAPIView, RetrieveAPIView,
 from rest_framework.exceptions import ValidationError
 from django.db.models import Q
 from django.utils import timezone
+from core.views import ConditionalGetMixin, OptimizedQuerysetMixin
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
@@ -114,7 +115,7 @@ class ArticleCreateView(CreateAPIView):
         except Exception as e:
             raise ValidationError(str(e))
 
-class ArticleDetailView(RetrieveAPIView):
+class ArticleDetailView(ConditionalGetMixin, RetrieveAPIView):
     serializer_class = ArticleSerializer
     permission_classes = [IsAuthenticated]
 
@@ -226,14 +227,14 @@ class UserBookmarkCreateView(generics.CreateAPIView):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
-class UserBookmarkDetailView(generics.RetrieveUpdateDestroyAPIView):
+class UserBookmarkDetailView(OptimizedQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated, IsOwner]
     serializer_class = UserBookmarkSerializer
 
     def get_queryset(self):
         return UserBookmark.objects.filter(user=self.request.user)
 
-class BookmarkListView(ListAPIView):
+class BookmarkListView(OptimizedQuerysetMixin, ListAPIView):
     serializer_class = UserBookmarkSerializer
     permission_classes = [IsAuthenticated]
 
@@ -325,14 +326,14 @@ class BookmarkCreateView(CreateAPIView):
         except Exception as e:
             raise ValidationError(str(e))
 
-class BookmarkDetailView(RetrieveAPIView):
+class BookmarkDetailView(OptimizedQuerysetMixin, RetrieveAPIView):
     serializer_class = UserBookmarkSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         return UserBookmark.objects.filter(user=self.request.user)
 
-class BookmarkUpdateView(UpdateAPIView):
+class BookmarkUpdateView(OptimizedQuerysetMixin, UpdateAPIView):
     serializer_class = UserBookmarkSerializer
     permission_classes = [IsAuthenticated]
 
@@ -414,14 +415,14 @@ class BookmarkView(APIView):
                 'error': 'Article not found'
             }, status=404)
 
-class BookmarkedArticlesView(generics.ListAPIView):
+class BookmarkedArticlesView(OptimizedQuerysetMixin, generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = UserBookmarkSerializer
 
     def get_queryset(self):
         return UserBookmark.objects.filter(user=self.request.user)
 
-class DiscoveryLearnView(generics.ListAPIView):
+class DiscoveryLearnView(ConditionalGetMixin, generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = ArticleSerializer
 
@@ -434,7 +435,7 @@ class DiscoveryLearnView(generics.ListAPIView):
 
         return queryset
 
-class ArticleDetailsView(generics.RetrieveAPIView):
+class ArticleDetailsView(ConditionalGetMixin, generics.RetrieveAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = ArticleSerializer
     queryset = Article.objects.all()
@@ -454,3 +455,15 @@ class ArticleDetailsView(generics.RetrieveAPIView):
         data['is_bookmarked'] = is_bookmarked
 
         return Response(data)
+
+    def get_etag_parts(self):
+        is_bookmarked = UserBookmark.objects.filter(
+            user=self.request.user,
+            article_id=self.kwargs['id']
+        ).exists()
+        return (self.request.user.pk, is_bookmarked)
+
+    def get_validators(self):
+        # No Last-Modified: bookmarking doesn't change the article's updated_at
+        etag, last_modified = super().get_validators()
+        return etag, None
@@ -1,13 +1,14 @@
-from django.db.models import Q
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
+from birds import search as bird_search
 from birds.models import Bird, Article
 from birds.serializers import BirdListSerializer, ArticleSerializer
+from core.views import CompiledListMixin, ConditionalGetMixin
 
 
-class ExploreView(generics.ListAPIView):
+class ExploreView(ConditionalGetMixin, generics.ListAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = ArticleSerializer
@@ -17,7 +18,7 @@ class ExploreView(generics.ListAPIView):
             category__in=['Migration', 'Feeder Birds']
         ).order_by('-published_date')
 
-class BirdSearchView(generics.ListAPIView):
+class BirdSearchView(CompiledListMixin, generics.ListAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = BirdListSerializer
@@ -29,21 +30,16 @@ class BirdSearchView(generics.ListAPIView):
 
         queryset = Bird.objects.all()
 
-        if query:
-            queryset = queryset.filter(
-                Q(name__icontains=query) |
-                Q(scientific_name__icontains=query)
-            )
-
         if filter_type and filter_value:
             if filter_type.lower() == 'rarity':
                 queryset = queryset.filter(rarity__iexact=filter_value)
             elif filter_type.lower() == 'region':
-                queryset = queryset.filter(global_distribution__icontains=filter_value)
+                queryset = bird_search.search_text(queryset, 'global_distribution', filter_value)
 
-        return queryset
+        # Ranked best match first
+        return bird_search.search(queryset, query, bird_search.BIRD_FIELDS)
 
-class CommonFeederBirdsView(generics.ListAPIView):
+class CommonFeederBirdsView(CompiledListMixin, generics.ListAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = BirdListSerializer
@@ -53,7 +49,7 @@ class CommonFeederBirdsView(generics.ListAPIView):
             behavior__icontains='feeder'
         ).order_by('name')
 
-class BirdsByCategoryView(generics.ListAPIView):
+class BirdsByCategoryView(ConditionalGetMixin, CompiledListMixin, generics.ListAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     serializer_class = BirdListSerializer
@@ -64,5 +60,5 @@ class BirdsByCategoryView(generics.ListAPIView):
             return Bird.objects.none()
 
         return Bird.objects.filter(
-            birdcategoryassignment__category__name=category
+            category_assignments__category__name=category
         ).order_by('name')
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.9 on 2026-10-18 23:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nearby', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='spotbirdsighting',
+            index=models.Index(fields=['spot', 'sighting_date'], name='nearby_sighting_spot_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='spotbirdsighting',
+            index=models.Index(condition=models.Q(('is_verified', True)), fields=['spot'], name='nearby_sighting_verified_idx'),
+        ),
+    ]
@@ -26,5 +26,13 @@ class SpotBirdSighting(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_verified = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # A spot's sightings by date
+            models.Index(fields=['spot', 'sighting_date'], name='nearby_sighting_spot_date_idx'),
+            # Nearby activity reads only verified sightings, a small share of the table
+            models.Index(fields=['spot'], condition=models.Q(is_verified=True), name='nearby_sighting_verified_idx'),
+        ]
+
     def __str__(self):
         return f"{self.bird.name} at {self.spot.name} on {self.sighting_date}"
@@ -1,3 +1,17 @@
-from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from core.testing import QueryBudgetTestMixin, budgeted_url_names, seed_query_budget_data
+
+class QueryBudgetTests(QueryBudgetTestMixin, APITestCase):
+    def setUp(self):
+        self.user = seed_query_budget_data(rows=20)
+
+    def test_every_budgeted_view_is_covered(self):
+        self.assertEqual(budgeted_url_names('nearby'), {'nearby:nearby_bird_activity_all'})
+
+    def test_nearby_bird_activity_all(self):
+        response = self.assertWithinQueryBudget(
+            reverse('nearby:nearby_bird_activity_all') + '?latitude=51.5&longitude=-0.1', user=self.user
+        )
+        self.assertEqual(len(response.data), 20)
@@ -7,7 +7,8 @@ from django.db.models import Q
 from .models import NearbySpot, SpotBirdSighting
 from .serializers import NearbySpotSerializer, SpotBirdSightingSerializer
 from core.permissions import IsOwnerOrReadOnly, IsOwner
-from core.views import BaseAPIView
+from core.querysets import optimize_for_serializer
+from core.views import BaseAPIView, CompiledListMixin, OptimizedQuerysetMixin, SparseFieldsetMixin
 from rest_framework.exceptions import ValidationError
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
@@ -51,7 +52,7 @@ class SpotBirdSightingCreateView(generics.CreateAPIView):
     def perform_create(self, serializer):
         serializer.save(reported_by=self.request.user)
 
-class SpotBirdSightingDetailView(generics.RetrieveUpdateDestroyAPIView):
+class SpotBirdSightingDetailView(SparseFieldsetMixin, OptimizedQuerysetMixin, generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated, IsOwnerOrReadOnly]
     serializer_class = SpotBirdSightingSerializer
     queryset = SpotBirdSighting.objects.all()
@@ -87,7 +88,7 @@ class NearbySpotsView(generics.ListAPIView):
         # Sort by distance
         return sorted(nearby_spots, key=lambda x: x.distance)
 
-class NearbyBirdListView(generics.ListAPIView):
+class NearbyBirdListView(SparseFieldsetMixin, CompiledListMixin, OptimizedQuerysetMixin, generics.ListAPIView):
     serializer_class = SpotBirdSightingSerializer
     permission_classes = [IsAuthenticated]
 
@@ -107,7 +108,9 @@ class NearbyBirdActivityView(BaseAPIView):
             raise ValidationError("Invalid latitude, longitude, or radius parameters")
 
         # Get all sightings and filter by distance
-        sightings = SpotBirdSighting.objects.filter(is_verified=True)
+        sightings = optimize_for_serializer(
+            SpotBirdSighting.objects.filter(is_verified=True), SpotBirdSightingSerializer()
+        )
         nearby_sightings = []
 
         for sighting in sightings:
@@ -138,9 +141,12 @@ class NearbyBirdActivitySearchView(generics.ListAPIView):
             raise ValidationError("Invalid latitude, longitude, or radius parameters")
 
         # Get all sightings matching the query
-        sightings = SpotBirdSighting.objects.filter(
-            Q(bird__name__icontains=query) | Q(notes__icontains=query),
-            is_verified=True
+        sightings = optimize_for_serializer(
+            SpotBirdSighting.objects.filter(
+                Q(bird__name__icontains=query) | Q(notes__icontains=query),
+                is_verified=True
+            ),
+            SpotBirdSightingSerializer()
         )
 
         # Filter by distance
@@ -160,6 +166,7 @@ class NearbyBirdActivitySearchView(generics.ListAPIView):
 class NearbyBirdActivityViewAllView(generics.ListAPIView):
     serializer_class = SpotBirdSightingSerializer
     permission_classes = [IsAuthenticated]
+    query_budget = 6
 
     def get_queryset(self):
         try:
@@ -170,7 +177,9 @@ class NearbyBirdActivityViewAllView(generics.ListAPIView):
             raise ValidationError("Invalid latitude, longitude, or radius parameters")
 
         # Get all verified sightings
-        sightings = SpotBirdSighting.objects.filter(is_verified=True)
+        sightings = optimize_for_serializer(
+            SpotBirdSighting.objects.filter(is_verified=True), SpotBirdSightingSerializer()
+        )
         nearby_sightings = []
 
         for sighting in sightings:
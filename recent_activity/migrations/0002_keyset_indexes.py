@@ -0,0 +1,17 @@
+# Generated by Django 4.2.9 on 2026-10-18 23:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recent_activity', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='useractivity',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='activity_user_created_idx'),
+        ),
+    ]
@@ -23,6 +23,10 @@ class UserActivity(models.Model):
         app_label = 'recent_activity'
         ordering = ['-created_at']
         verbose_name_plural = 'User Activities'
+        indexes = [
+            # Keyset pagination of a user's activity feed (core/pagination.py)
+            models.Index(fields=['user', 'created_at', 'id'], name='activity_user_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.activity_type} - {self.created_at}"
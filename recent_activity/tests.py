@@ -1,3 +1,24 @@
-from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from core.testing import QueryBudgetTestMixin, budgeted_url_names, seed_query_budget_data
+
+class QueryBudgetTests(QueryBudgetTestMixin, APITestCase):
+    def setUp(self):
+        self.user = seed_query_budget_data(rows=20)
+
+    def test_every_budgeted_view_is_covered(self):
+        self.assertEqual(
+            budgeted_url_names('recent_activity'),
+            {'recent_activity:recent_activity', 'recent_activity:recent_activity_all'}
+        )
+
+    def test_recent_activity(self):
+        response = self.assertWithinQueryBudget(reverse('recent_activity:recent_activity'), user=self.user)
+        self.assertEqual(len(response.data), 10)
+
+    def test_recent_activity_all(self):
+        path = reverse('recent_activity:recent_activity_all')
+        response = self.assertWithinQueryBudget(path, user=self.user)
+        # The next page costs the same as the first
+        self.assertWithinQueryBudget(response.data['next'], user=self.user)
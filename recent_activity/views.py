@@ -6,13 +6,17 @@ from rest_framework.permissions import IsAuthenticated
 from django.db.models import Q
 from .models import UserActivity, RecentActivity
 from .serializers import UserActivitySerializer, RecentActivitySerializer
-from core.views import BaseAPIView
+from core.querysets import optimize_for_serializer
+from core.pagination import KeysetPagination
+from core.views import BaseAPIView, OptimizedQuerysetMixin, SparseFieldsetMixin
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
 # Create your views here.
 
 class UserRecentActivityView(BaseAPIView):
+    query_budget = 4
+
     @swagger_auto_schema(
         operation_description="Get user's recent activities (limited to 10)",
         responses={
@@ -21,18 +25,22 @@ class UserRecentActivityView(BaseAPIView):
         }
     )
     def get(self, request):
-        activities = UserActivity.objects.filter(user=request.user)[:10]
+        activities = optimize_for_serializer(
+            UserActivity.objects.filter(user=request.user), UserActivitySerializer()
+        )[:10]
         serializer = UserActivitySerializer(activities, many=True)
         return Response(serializer.data)
 
-class UserRecentActivityViewAllView(generics.ListAPIView):
+class UserRecentActivityViewAllView(SparseFieldsetMixin, OptimizedQuerysetMixin, generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = UserActivitySerializer
+    pagination_class = KeysetPagination
+    query_budget = 6
 
     def get_queryset(self):
         return UserActivity.objects.filter(user=self.request.user)
 
-class UserRecentActivitySearchView(generics.ListAPIView):
+class UserRecentActivitySearchView(SparseFieldsetMixin, OptimizedQuerysetMixin, generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = UserActivitySerializer
 
@@ -45,14 +53,14 @@ class UserRecentActivitySearchView(generics.ListAPIView):
              Q(location_name__icontains=query))
         )
 
-class RecentActivityView(generics.ListAPIView):
+class RecentActivityView(OptimizedQuerysetMixin, generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = RecentActivitySerializer
 
     def get_queryset(self):
         return RecentActivity.objects.filter(user=self.request.user)
 
-class RecentActivitySearchView(generics.ListAPIView):
+class RecentActivitySearchView(OptimizedQuerysetMixin, generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = RecentActivitySerializer
 